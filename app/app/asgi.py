@@ -14,6 +14,7 @@ from django.urls import re_path
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from app.ws_middleware import TokenAuthMiddleware
+from app.lifespan import LifespanApp, install_daphne_shutdown
 from channels.security.websocket import AllowedHostsOriginValidator
 from chat.routing import websocket_urlpatterns
 
@@ -25,5 +26,7 @@ application = ProtocolTypeRouter(
         "websocket": AllowedHostsOriginValidator(
             application=TokenAuthMiddleware(inner=URLRouter(routes=websocket_urlpatterns))
         ),
+        "lifespan": LifespanApp(),
     }
 )
+install_daphne_shutdown()
@@ -1,6 +1,9 @@
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_ready
+from django.conf import settings
+from prometheus_client import start_http_server
 import datetime
 
 
@@ -33,10 +36,25 @@ app.conf.update(
     CELERY_TASK_SERIALIZER="json",
     CELERY_RESULT_SERIALIZER="json",
     CELERYBEAT_SCHEDULE={
-        # 'withdraw-check-task': {
-        #     'task': 'users.tasks.check_hash',
-        #     'schedule':  datetime.timedelta(seconds=60),
-        #     'args': ()
-        # },
+        'withdraw-check-task': {
+            'task': 'users.tasks.check_hash',
+            'schedule':  datetime.timedelta(seconds=15),
+            'args': (),
+            # A run queued behind a busy worker is dropped rather than piling up.
+            'options': {'expires': 15},
+        },
+        'coin-index-refresh-task': {
+            'task': 'coin.tasks.refresh_search_index',
+            'schedule':  datetime.timedelta(seconds=settings.COIN_INDEX_REFRESH_INTERVAL),
+            'args': ()
+        },
     }
-)
\ No newline at end of file
+)
+
+
+@worker_ready.connect
+def start_metrics_server(**kwargs) -> None:
+    # Reconciler/worker metrics live in the worker process; expose them when a port is configured.
+    port: str | None = os.getenv(key="CELERY_METRICS_PORT")
+    if port:
+        start_http_server(port=int(port))
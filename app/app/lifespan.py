@@ -0,0 +1,49 @@
+from typing import Any
+import asyncio
+import sys
+
+from utils.http_pool import HttpPool
+from utils.redis_pool import RedisPool, RedisSubscriber
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+async def close_pools() -> None:
+    try:
+        await HttpPool.close()
+        await RedisSubscriber.close()
+        await RedisPool.close()
+    except Exception as e:
+        logger.error(msg=f'Pool shutdown error: {e}')
+
+
+class LifespanApp:
+    """Handles ASGI lifespan events so pooled clients are closed on shutdown.
+
+    Only servers implementing the lifespan protocol (uvicorn, hypercorn)
+    send these events; under daphne install_daphne_shutdown does the job.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        while True:
+            message: dict[str, Any] = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await close_pools()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def install_daphne_shutdown() -> None:
+    """Close the pools from a Twisted shutdown trigger, since daphne never sends lifespan events."""
+    # Only when daphne has already installed its asyncio reactor; importing the reactor here would install the default one.
+    reactor: Any = sys.modules.get('twisted.internet.reactor')
+    loop: asyncio.AbstractEventLoop | None = getattr(reactor, '_asyncioEventloop', None)
+    if loop is None:
+        return
+    from twisted.internet.defer import Deferred
+
+    reactor.addSystemEventTrigger('before', 'shutdown', lambda: Deferred.fromFuture(asyncio.ensure_future(close_pools(), loop=loop)))
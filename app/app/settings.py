@@ -96,6 +96,7 @@ CORS_ALLOW_HEADERS = (
     'sentry-trace',
     'baggage',
     'taloveToken',
+    'idempotency-key',
 )
 
 ROOT_URLCONF: str = "app.urls"
@@ -223,6 +224,10 @@ CELERY_ACCEPT_CONTENT: list[str] = ["application/json"]
 CELERY_TASK_SERIALIZER: str = "json"
 CELERY_RESULT_SERIALIZER: str = "json"
 CELERY_TIMEZONE: str | None = os.getenv(key="CELERY_TIMEZONE")
+# Signing/broadcasting runs on its own worker so slow chains do not hold API or default workers
+CELERY_TASK_ROUTES: dict[str, dict[str, str]] = {
+    "users.tasks.submit_transaction": {"queue": "transactions"},
+}
 
 REST_FRAMEWORK: dict[str, Any] = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -255,6 +260,90 @@ CHANNEL_LAYERS: dict[str, dict[str, Any]] = {
     },
 }
 
+# Pooled aiohttp client used for upstream calls in w3/
+HTTP_POOL_LIMIT: int = int(os.getenv(key="HTTP_POOL_LIMIT", default=200))
+HTTP_POOL_LIMIT_PER_HOST: int = int(os.getenv(key="HTTP_POOL_LIMIT_PER_HOST", default=32))
+HTTP_POOL_DNS_TTL: int = int(os.getenv(key="HTTP_POOL_DNS_TTL", default=300))
+HTTP_POOL_KEEPALIVE: float = float(os.getenv(key="HTTP_POOL_KEEPALIVE", default=30))
+HTTP_POOL_TIMEOUT: float = float(os.getenv(key="HTTP_POOL_TIMEOUT", default=30))
+
+# Per-call deadline for utils.fetch market-data requests
+FETCH_TIMEOUT: float = float(os.getenv(key="FETCH_TIMEOUT", default=5))
+
+# Wallet balance cache (stale-while-revalidate), seconds
+BALANCE_CACHE_FRESH_TTL: int = int(os.getenv(key="BALANCE_CACHE_FRESH_TTL", default=30))
+BALANCE_CACHE_STALE_TTL: int = int(os.getenv(key="BALANCE_CACHE_STALE_TTL", default=600))
+BALANCE_CACHE_REFRESH_LOCK_TTL: int = int(os.getenv(key="BALANCE_CACHE_REFRESH_LOCK_TTL", default=30))
+
+# Upstream rate limits as (requests per second, burst); `rpc` applies to every rpc:<chain> bucket
+UPSTREAM_RATE_LIMITS: dict[str, tuple[float, int]] = {
+    "cqt": (float(os.getenv(key="CQT_RATE_LIMIT", default=20)), int(os.getenv(key="CQT_RATE_BURST", default=25))),
+    "merlin": (float(os.getenv(key="MERLIN_RATE_LIMIT", default=5)), int(os.getenv(key="MERLIN_RATE_BURST", default=10))),
+    "rpc": (float(os.getenv(key="RPC_RATE_LIMIT", default=10)), int(os.getenv(key="RPC_RATE_BURST", default=20))),
+}
+UPSTREAM_RATE_MAX_WAIT: float = float(os.getenv(key="UPSTREAM_RATE_MAX_WAIT", default=10))
+
+# Upstream circuit breakers
+CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv(key="CIRCUIT_FAILURE_THRESHOLD", default=5))
+CIRCUIT_RECOVERY_TIMEOUT: float = float(os.getenv(key="CIRCUIT_RECOVERY_TIMEOUT", default=30))
+
+# JSON-RPC endpoint pool: EWMA smoothing, per-request timeout and hedging past the best endpoint's p95 latency
+RPC_POOL_EWMA_ALPHA: float = float(os.getenv(key="RPC_POOL_EWMA_ALPHA", default=0.2))
+RPC_POOL_TIMEOUT: float = float(os.getenv(key="RPC_POOL_TIMEOUT", default=10))
+RPC_POOL_HEDGE: bool = os.getenv(key="RPC_POOL_HEDGE", default="true").lower() == "true"
+RPC_POOL_HEDGE_MIN_DELAY: float = float(os.getenv(key="RPC_POOL_HEDGE_MIN_DELAY", default=0.2))
+
+# Address classification (EOA/contract/token) cache, seconds; an EOA can gain code later so it expires sooner
+ACCOUNT_TYPE_CACHE_TTL: int = int(os.getenv(key="ACCOUNT_TYPE_CACHE_TTL", default=30 * 24 * 3600))
+ACCOUNT_TYPE_USER_CACHE_TTL: int = int(os.getenv(key="ACCOUNT_TYPE_USER_CACHE_TTL", default=24 * 3600))
+
+# Bulk wallet import: key derivation moves to a process pool from this batch size up
+WALLET_IMPORT_PROCESS_THRESHOLD: int = int(os.getenv(key="WALLET_IMPORT_PROCESS_THRESHOLD", default=50))
+WALLET_IMPORT_PROCESSES: int = int(os.getenv(key="WALLET_IMPORT_PROCESSES", default=min(4, os.cpu_count() or 1)))
+
+# Idempotency-Key: replay window and in-flight marker lifetime (longer than the slowest submission)
+IDEMPOTENCY_TTL: int = int(os.getenv(key="IDEMPOTENCY_TTL", default=24 * 3600))
+IDEMPOTENCY_LOCK_TTL: int = int(os.getenv(key="IDEMPOTENCY_LOCK_TTL", default=120))
+
+# Transaction status reconciler (users.tasks.check_hash): pending rows older than the timeout become status 2;
+# the lock keeps runs from overlapping and expires on its own if a worker dies mid-run
+RECONCILE_TIMEOUT: int = int(os.getenv(key="RECONCILE_TIMEOUT", default=180))
+RECONCILE_PAGE_SIZE: int = int(os.getenv(key="RECONCILE_PAGE_SIZE", default=500))
+RECONCILE_LOCK_TTL: int = int(os.getenv(key="RECONCILE_LOCK_TTL", default=300))
+
+# Longest a /hash/status/wait/ long-poll is held open, in seconds
+HASH_STATUS_WAIT_TIMEOUT: float = float(os.getenv(key="HASH_STATUS_WAIT_TIMEOUT", default=25))
+
+# How long a final (success/failed) transaction status is served from cache by /hash/status/batch/
+HASH_STATUS_CACHE_TTL: int = int(os.getenv(key="HASH_STATUS_CACHE_TTL", default=24 * 3600))
+
+# Token metadata store (w3.token_meta): static fields for hours, market fields for seconds, vendor misses for minutes, in-process LRU size
+TOKEN_META_STATIC_TTL: int = int(os.getenv(key="TOKEN_META_STATIC_TTL", default=6 * 3600))
+TOKEN_META_MARKET_TTL: int = int(os.getenv(key="TOKEN_META_MARKET_TTL", default=15))
+TOKEN_META_MISS_TTL: int = int(os.getenv(key="TOKEN_META_MISS_TTL", default=300))
+TOKEN_META_LRU_SIZE: int = int(os.getenv(key="TOKEN_META_LRU_SIZE", default=4096))
+
+# Longest CoinInfoView waits on its vendor calls before answering with what it has
+COIN_INFO_DEADLINE: float = float(os.getenv(key="COIN_INFO_DEADLINE", default=2))
+
+# DefinedAPI.search: results kept per keyword, rows per upstream page and most pages read (the symbol-prefix filter runs on
+# our side), and how long results are cached per normalised keyword
+DEFINED_SEARCH_LIMIT: int = int(os.getenv(key="DEFINED_SEARCH_LIMIT", default=20))
+DEFINED_SEARCH_PAGE_SIZE: int = int(os.getenv(key="DEFINED_SEARCH_PAGE_SIZE", default=25))
+DEFINED_SEARCH_MAX_PAGES: int = int(os.getenv(key="DEFINED_SEARCH_MAX_PAGES", default=8))
+DEFINED_SEARCH_CACHE_TTL: int = int(os.getenv(key="DEFINED_SEARCH_CACHE_TTL", default=60))
+
+# Federated token search (coin.search): wait on the sources at most this long, rows returned, merged result cache
+FEDERATED_SEARCH_DEADLINE: float = float(os.getenv(key="FEDERATED_SEARCH_DEADLINE", default=1.5))
+FEDERATED_SEARCH_LIMIT: int = int(os.getenv(key="FEDERATED_SEARCH_LIMIT", default=30))
+FEDERATED_SEARCH_CACHE_TTL: int = int(os.getenv(key="FEDERATED_SEARCH_CACHE_TTL", default=60))
+
+# In-memory coin_source search index (coin.search_index): how often celery beat republishes coin_source to Redis,
+# how often a process pulls changes, changelog versions kept
+COIN_INDEX_REFRESH_INTERVAL: int = int(os.getenv(key="COIN_INDEX_REFRESH_INTERVAL", default=300))
+COIN_INDEX_SYNC_INTERVAL: float = float(os.getenv(key="COIN_INDEX_SYNC_INTERVAL", default=60))
+COIN_INDEX_CHANGELOG_VERSIONS: int = int(os.getenv(key="COIN_INDEX_CHANGELOG_VERSIONS", default=100))
+
 LOG_DIR: str = os.path.join(BASE_DIR, "logs")  # Set your log directory as needed
 
 # Ensure the log directory exists
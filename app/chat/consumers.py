@@ -55,6 +55,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         )
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+        await self.channel_layer.group_add(f"user_{self.user_id}", self.channel_name)
         await self.accept()
 
         asyncio.create_task(coro=self.safe_task(coro=self.init()))
@@ -64,6 +65,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code: int) -> None:
         await self.redis.close()
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        if hasattr(self, 'user_id'):
+            await self.channel_layer.group_discard(f"user_{self.user_id}", self.channel_name)
 
     async def init(self) -> None:
         self.last_ping_time: datetime = datetime.now()
@@ -122,6 +125,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
         
         await self.send(text_data=json.dumps(obj={"type": "message", "data": message, "user_id": self.user_id}, ensure_ascii=False))
 
+    async def job_status(self, event: dict) -> None:
+        await self.send(text_data=json.dumps(obj={"type": "job", "data": event["data"]}, ensure_ascii=False))
+
+    async def tx_status(self, event: dict) -> None:
+        await self.send(text_data=json.dumps(obj={"type": "tx_status", "data": event["data"]}, ensure_ascii=False))
+
     async def safe_task(self, coro: Any) -> None:
         try:
             await coro
@@ -0,0 +1,265 @@
+from typing import Any, Callable
+import asyncio
+import hashlib
+import math
+import os
+from urllib.parse import urljoin
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.manager import BaseManager
+from django.db.models.query import RawQuerySet
+
+from . import models, serializers
+from .search_index import CoinIndex, SearchIndex
+from utils import constants
+from w3.dex import AveAPI, DefinedAPI, GeckoAPI
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+def local_search(kw: str, num: int=10) -> list[dict[str, Any]]:
+    """coin_source tokens by symbol, then name/slug, then chain address.
+
+    Served from the in-memory CoinIndex; the SQL below is only used until
+    the index has been loaded.
+    """
+    index: SearchIndex | None = CoinIndex.current()
+    if index is not None:
+        return index.search(kw=kw, num=num)
+
+    reserved_chars = r'''?&|!{}[]()^~*:\\"'+-'''
+    replace: list[str] = ['\\' + l for l in reserved_chars]
+    trans: dict[int, str] = str.maketrans(dict(zip(reserved_chars, replace)))
+    kw = str(object=kw).strip().translate(trans).replace('%', '')
+
+    sql: str = f"""
+    select id,name,symbol,logo
+    from token
+    where symbol ilike %s
+    order by char_length(symbol) asc, strpos(%s,symbol) asc, market_cap desc
+    limit {num};
+    """
+    objs: RawQuerySet[Any] = models.Coin.objects.using(alias='coin_source').raw(raw_query=sql, params=[f'%{kw}%', kw])
+    ser_data: list[dict[str, Any]] = list(serializers.CoinSearch(objs, many=True).data)
+    tokens: list[int] = [t['id'] for t in ser_data]
+
+    full_objs: BaseManager[models.Coin] = models.Coin.objects.using(alias='coin_source').filter(Q(name__icontains = kw) | Q(slug__icontains = kw)).order_by('-market_cap')[:num]
+    for fs in serializers.CoinSearch(full_objs, many=True).data:
+        if fs['id'] in tokens:
+            continue
+        tokens.append(fs['id'])
+        ser_data.append(fs)
+
+    chain_objs: BaseManager[models.CoinChainData] = models.CoinChainData.objects.using(alias='coin_source').filter(address__icontains = kw)[:num]
+    for chain_obj in chain_objs:
+        try:
+            token: models.Coin = chain_obj.token
+            if token.id in tokens:
+                continue
+            tokens.append(token.id)
+            ser_data.append(dict(id=token.id,name=token.name,symbol=token.symbol,logo=urljoin(base=os.getenv(key='IMAGE_DOMAIN'), url=token.logo)))
+        except:
+            continue
+    return ser_data[:num]
+
+
+def chain_data(chain: str) -> dict[str, Any]:
+    return dict(name=chain, id=str(object=constants.CHAIN_DICT[chain]['id']), logo=f"{os.getenv(key='S3_DOMAIN')}/chains/logo/{chain}.png")
+
+
+def from_local(item: dict[str, Any]) -> dict[str, Any]:
+    return dict(
+        coin_id=item.get('id'),
+        name=item.get('name'),
+        symbol=item.get('symbol'),
+        logo=item.get('logo'),
+        coin_chains=item.get('chain') or [],
+    )
+
+
+def from_defined(item: dict[str, Any]) -> dict[str, Any] | None:
+    chain: str | None = (item.get('chain') or {}).get('name')
+    if not chain or not item.get('address'):
+        return None
+    return dict(
+        chain=chain,
+        address=item['address'],
+        name=item.get('name'),
+        symbol=item.get('symbol'),
+        decimals=item.get('decimals'),
+        logo=item.get('logo'),
+        price_usd=item.get('price_usd'),
+        price_change_24h=item.get('price_change_24h'),
+        market_cap=item.get('market_cap'),
+        liquidity=item.get('liquidity'),
+        volume=item.get('volume'),
+        holders=item.get('holders'),
+        is_scam=item.get('is_scam'),
+    )
+
+
+def from_gecko(item: dict[str, Any]) -> dict[str, Any] | None:
+    chain: str | None = constants.GECKO_CHAIN_DICT.get((item.get('network') or {}).get('identifier', ''))
+    tokens: list[dict[str, Any]] = item.get('tokens') or []
+    token: dict[str, Any] = next((t for t in tokens if t.get('is_base_token')), tokens[0] if tokens else {})
+    if not chain or not token.get('address'):
+        return None
+    return dict(
+        chain=chain,
+        address=token['address'],
+        name=token.get('name'),
+        symbol=token.get('symbol'),
+        logo=token.get('image_url'),
+        price_usd=item.get('price_in_usd'),
+        liquidity=item.get('reserve_in_usd'),
+    )
+
+
+def from_ave(item: dict[str, Any]) -> dict[str, Any] | None:
+    chain: str | None = constants.AVE_CHAIN_DICT.get(item.get('chain', ''))
+    if not chain or not item.get('token'):
+        return None
+    return dict(
+        chain=chain,
+        address=item['token'],
+        name=item.get('name'),
+        symbol=item.get('symbol'),
+        decimals=item.get('decimal'),
+        logo=item.get('logo_url'),
+        price_usd=item.get('current_price_usd'),
+        price_change_24h=item.get('price_change_24h'),
+        market_cap=item.get('market_cap'),
+        liquidity=item.get('main_pair_tvl'),
+        volume=item.get('tx_volume_u_24h'),
+        holders=item.get('holders'),
+    )
+
+
+def to_float(value: Any) -> float:
+    try:
+        return max(float(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def score(item: dict[str, Any], kw: str) -> float:
+    """One ranking for every source: match quality, then size, then agreement between sources."""
+    kw = kw.lower()
+    symbol: str = str(item.get('symbol') or '').lower()
+    name: str = str(item.get('name') or '').lower()
+    value: float = 0
+    if str(item.get('address') or '').lower() == kw:
+        value += 200
+    if symbol == kw:
+        value += 100
+    elif symbol.startswith(kw):
+        value += 60
+    elif kw in symbol:
+        value += 30
+    elif kw in name:
+        value += 15
+    value -= len(symbol) * 0.5
+    value += 4 * math.log10(1 + (to_float(item.get('market_cap')) or to_float(item.get('liquidity'))))
+    value += 2 * math.log10(1 + to_float(item.get('volume')))
+    value += 5 * (len(item['sources']) - 1)
+    value += max(0, 10 - item['position'])
+    if item.get('is_scam'):
+        value -= 100
+    return value
+
+
+class FederatedSearch():
+    """Token search over the local coin_source DB, Defined, Gecko and Ave at once.
+
+    Every source runs concurrently and the merge waits at most
+    FEDERATED_SEARCH_DEADLINE seconds; sources that have not answered by
+    then are listed in `missing`. Vendor rows are deduped by (chain,
+    address); a local coin is merged into the vendor row sharing one of its
+    chain addresses. Everything is ranked with `score` and complete results
+    are cached per normalised keyword.
+    """
+    key_prefix: str = 'satoshi:federated_search'
+
+    sources: dict[str, tuple[Callable[[str], list[dict]], Callable[[dict], dict | None], bool]] = {
+        # name: (search, normaliser, thread_sensitive); vendor calls are plain HTTP and run off the shared sync thread.
+        'local': (local_search, from_local, True),
+        'defined': (DefinedAPI.search, from_defined, False),
+        'gecko': (lambda kw: (GeckoAPI.search(kw=kw) or {}).get('pools', []), from_gecko, False),
+        'ave': (AveAPI.search, from_ave, False),
+    }
+
+    @classmethod
+    def _key(cls, kw: str) -> str:
+        return f'{cls.key_prefix}:{hashlib.md5(kw.encode()).hexdigest()}'
+
+    @classmethod
+    async def search(cls, kw: str) -> dict[str, Any]:
+        # Addresses are case-sensitive on some chains, so only the cache key and ranking use the lowered keyword.
+        kw = kw.strip()
+        cache_key: str = cls._key(kw=kw.lower())
+        data: dict[str, Any] | None = await cache.aget(key=cache_key)
+        if data is not None:
+            return data
+
+        tasks: dict[asyncio.Task, str] = {
+            asyncio.create_task(sync_to_async(func, thread_sensitive=thread_sensitive)(kw)): name
+            for name, (func, _, thread_sensitive) in cls.sources.items()
+        }
+        done, pending = await asyncio.wait(tasks, timeout=settings.FEDERATED_SEARCH_DEADLINE)
+        for task in pending:
+            task.cancel()
+
+        results: dict[str, list[dict]] = {}
+        missing: list[str] = [tasks[task] for task in pending]
+        for task in done:
+            if task.exception() is not None:
+                logger.warning(msg=f'Federated search {tasks[task]} error: {task.exception()}')
+                missing.append(tasks[task])
+                continue
+            results[tasks[task]] = task.result() or []
+
+        tokens: list[dict[str, Any]] = cls.merge(results=results, kw=kw)
+        data = dict(tokens=tokens[:settings.FEDERATED_SEARCH_LIMIT], partial=bool(missing), missing=sorted(missing))
+        if not missing:
+            await cache.aset(key=cache_key, value=data, timeout=settings.FEDERATED_SEARCH_CACHE_TTL)
+        return data
+
+    @classmethod
+    def merge(cls, results: dict[str, list[dict]], kw: str) -> list[dict[str, Any]]:
+        merged: dict[tuple[str, str], dict[str, Any]] = {}
+        # Local coins last, so they can attach to a vendor row on the same address.
+        for name in sorted(results, key=lambda n: n == 'local'):
+            normalise: Callable[[dict], dict | None] = cls.sources[name][1]
+            for position, raw in enumerate(results[name]):
+                item: dict[str, Any] | None = normalise(raw)
+                if item is None:
+                    continue
+                if name == 'local':
+                    addresses: set[str] = {str(c.get('address') or '').lower() for c in item.pop('coin_chains')}
+                    key: tuple[str, str] = next((k for k in merged if k[1] in addresses), ('', f'coin:{item["coin_id"]}'))
+                else:
+                    key = (item['chain'], str(item['address']).lower())
+                current: dict[str, Any] | None = merged.get(key)
+                if current is None:
+                    merged[key] = dict(item, sources=[name], position=position)
+                    continue
+                for field, value in item.items():
+                    if current.get(field) is None:
+                        current[field] = value
+                current['sources'].append(name)
+                current['position'] = min(current['position'], position)
+
+        tokens: list[dict[str, Any]] = []
+        for item in merged.values():
+            item['score'] = round(score(item=item, kw=kw), 2)
+            if item.get('chain'):
+                item['chain'] = chain_data(chain=item['chain'])
+            del item['position']
+            tokens.append(item)
+        tokens.sort(key=lambda t: t['score'], reverse=True)
+        return tokens
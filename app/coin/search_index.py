@@ -0,0 +1,250 @@
+from bisect import bisect_left
+from typing import Any
+from urllib.parse import urljoin
+import json
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from . import models
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+def grams(text: str) -> set[str]:
+    """Every 1-, 2- and 3-character substring of `text`."""
+    return {text[i:i + n] for n in (1, 2, 3) for i in range(len(text) - n + 1)}
+
+
+class SearchIndex():
+    """Immutable search structures over a snapshot of coin_source tokens.
+
+    Postings map every 1-3 character gram to the tokens containing it,
+    kept in result order: symbol postings by `char_length(symbol), market_cap
+    desc` like the SQL search, name/slug postings by market cap. A keyword
+    walks its shortest posting list, checks the substring and stops once
+    enough rows are found. Chain addresses are kept in one sorted array:
+    prefixes are found with bisect, and substrings (the SQL used icontains)
+    by scanning it only when prefixes did not fill the page.
+    """
+
+    def __init__(self, tokens: dict[int, dict[str, Any]]) -> None:
+        self.tokens: dict[int, dict[str, Any]] = tokens
+        self.symbols: dict[int, str] = {i: (t['symbol'] or '').lower() for i, t in tokens.items()}
+        self.texts: dict[int, tuple[str, str]] = {i: ((t['name'] or '').lower(), (t['slug'] or '').lower()) for i, t in tokens.items()}
+        by_market_cap: list[int] = sorted(tokens, key=lambda i: -(tokens[i]['market_cap'] or 0))
+        self.position: dict[int, int] = {i: pos for pos, i in enumerate(by_market_cap)}
+
+        self.symbol_postings: dict[str, list[int]] = {}
+        for i in sorted(by_market_cap, key=lambda i: len(self.symbols[i])):
+            for gram in grams(text=self.symbols[i]):
+                self.symbol_postings.setdefault(gram, []).append(i)
+        self.text_postings: dict[str, list[int]] = {}
+        addresses: list[tuple[str, int]] = []
+        for i in by_market_cap:
+            for gram in grams(text=self.texts[i][0]) | grams(text=self.texts[i][1]):
+                self.text_postings.setdefault(gram, []).append(i)
+            addresses.extend((c['address'].lower(), i) for c in tokens[i]['chain'] if c.get('address'))
+        addresses.sort()
+        self.addresses: list[str] = [a for a, _ in addresses]
+        self.address_ids: list[int] = [i for _, i in addresses]
+        self.all_by_symbol: list[int] = sorted(by_market_cap, key=lambda i: len(self.symbols[i]))
+        self.all_by_market_cap: list[int] = by_market_cap
+
+    @staticmethod
+    def shortest(postings: dict[str, list[int]], kw: str, default: list[int]) -> list[int]:
+        if not kw:
+            return default
+        return min((postings.get(gram, []) for gram in grams(text=kw) if len(gram) == min(len(kw), 3)), key=len)
+
+    def match_symbol(self, kw: str, num: int) -> list[int]:
+        lower: str = kw.lower()
+        found: list[int] = []
+        for i in self.shortest(postings=self.symbol_postings, kw=lower, default=self.all_by_symbol):
+            # Finish the current length so the strpos tie-break below sees the whole tier.
+            if len(found) >= num and len(self.symbols[i]) > len(self.symbols[found[-1]]):
+                break
+            if lower in self.symbols[i]:
+                found.append(i)
+        # strpos(kw, symbol) in the SQL: case-sensitive, 0 when the symbol is not inside the keyword.
+        found.sort(key=lambda i: (len(self.symbols[i]), kw.find(self.tokens[i]['symbol'] or '') + 1, self.position[i]))
+        return found[:num]
+
+    def match_text(self, kw: str, num: int) -> list[int]:
+        lower: str = kw.lower()
+        found: list[int] = []
+        for i in self.shortest(postings=self.text_postings, kw=lower, default=self.all_by_market_cap):
+            if lower in self.texts[i][0] or lower in self.texts[i][1]:
+                found.append(i)
+                if len(found) >= num:
+                    break
+        return found
+
+    def match_address(self, kw: str, num: int) -> list[int]:
+        lower: str = kw.lower()
+        found: list[int] = []
+        for pos in range(bisect_left(self.addresses, lower), len(self.addresses)):
+            if len(found) >= num or not self.addresses[pos].startswith(lower):
+                break
+            found.append(self.address_ids[pos])
+        if len(found) < num:
+            for pos, address in enumerate(self.addresses):
+                if lower in address and self.address_ids[pos] not in found:
+                    found.append(self.address_ids[pos])
+                    if len(found) >= num:
+                        break
+        return found
+
+    def row(self, i: int) -> dict[str, Any]:
+        token: dict[str, Any] = self.tokens[i]
+        return dict(id=i, name=token['name'], symbol=token['symbol'], logo=token['logo'], chain=token['chain'])
+
+    def search(self, kw: str, num: int=10) -> list[dict[str, Any]]:
+        kw = str(object=kw).strip().replace('%', '')
+        ids: list[int] = self.match_symbol(kw=kw, num=num)
+        for i in self.match_text(kw=kw, num=num) + self.match_address(kw=kw, num=num):
+            if i not in ids:
+                ids.append(i)
+        return [self.row(i=i) for i in ids[:num]]
+
+
+class CoinIndex():
+    """Per-process SearchIndex kept in step with the Redis copy of coin_source.
+
+    The refresh_search_index task writes every token as JSON into the
+    `tokens` hash and records changed ids in the `changelog` sorted set,
+    scored by a version counter. A token only counts as changed when its
+    fingerprint does, which ignores market cap moves within a tenth of a
+    decade. A process loads the whole hash on its first search (falling
+    back to SQL until then), then at most every COIN_INDEX_SYNC_INTERVAL
+    seconds reads only the ids changed since its version and swaps in a
+    rebuilt index, in a background thread.
+    """
+    tokens_key: str = 'satoshi:coin_index:tokens'
+    changelog_key: str = 'satoshi:coin_index:changelog'
+    version_key: str = 'satoshi:coin_index:version'
+    floor_key: str = 'satoshi:coin_index:floor'
+
+    _index: SearchIndex | None = None
+    _tokens: dict[int, dict[str, Any]] = {}
+    _version: int = 0
+    _checked_at: float = 0
+    _lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(token: dict[str, Any]) -> str:
+        # Market caps move on every refresh; only a move that could reorder results counts.
+        stable: dict[str, Any] = {k: v for k, v in token.items() if k != 'market_cap'}
+        stable['market_cap_tier'] = round(math.log10(1 + max(float(token.get('market_cap') or 0), 0)), 1)
+        return json.dumps(obj=stable, sort_keys=True)
+
+    @classmethod
+    def current(cls) -> SearchIndex | None:
+        """The index to search, or None until one has been loaded (callers fall back to SQL)."""
+        if time.monotonic() - cls._checked_at >= settings.COIN_INDEX_SYNC_INTERVAL and not cls._lock.locked():
+            cls._checked_at = time.monotonic()
+            # Rebuilding takes a while, so requests keep using the old index meanwhile.
+            threading.Thread(target=cls.locked_sync, name='coin-index-sync', daemon=True).start()
+        return cls._index
+
+    @classmethod
+    def locked_sync(cls) -> None:
+        if not cls._lock.acquire(blocking=False):
+            return
+        try:
+            cls.sync()
+        except Exception as e:
+            logger.warning(msg=f'Coin index sync error: {e}')
+        finally:
+            cls._lock.release()
+
+    @classmethod
+    def sync(cls) -> None:
+        redis = get_redis_connection(alias='default')
+        version, floor = (int(v or 0) for v in redis.mget(cls.version_key, cls.floor_key))
+        if not version or version == cls._version:
+            return
+        if cls._index is None or cls._version < floor:
+            # First load, or the changelog was trimmed past our version.
+            tokens: dict[int, dict[str, Any]] = {int(k): json.loads(s=v) for k, v in redis.hgetall(cls.tokens_key).items()}
+        else:
+            changed: list[bytes] = redis.zrangebyscore(cls.changelog_key, cls._version + 1, version)
+            if not changed:
+                cls._version = version
+                return
+            tokens = dict(cls._tokens)
+            for key, value in zip(changed, redis.hmget(cls.tokens_key, changed)):
+                if value is None:
+                    tokens.pop(int(key), None)
+                else:
+                    tokens[int(key)] = json.loads(s=value)
+        cls._index = SearchIndex(tokens=tokens) if tokens else None
+        cls._tokens, cls._version = tokens, version
+        logger.info(msg=f'Coin index at version {version}: {len(tokens)} tokens')
+
+    @classmethod
+    def snapshot(cls) -> dict[int, dict[str, Any]]:
+        """Every coin_source token with its chain data, as stored in the hash."""
+        image_domain: str | None = os.getenv(key='IMAGE_DOMAIN')
+        chains: dict[int, list[dict[str, Any]]] = {}
+        chain_sql: str = """
+        select tcd.id, tcd.token_id, tcd.address, c.symbol, c.logo from token_chain_data tcd
+        left join chain c on tcd.platform_id=c.platform_id
+        order by tcd.id
+        """
+        for c in models.CoinChainData.objects.using(alias='coin_source').raw(raw_query=chain_sql):
+            chains.setdefault(c.token_id, []).append(dict(
+                address=c.address,
+                name = c.symbol,
+                logo = urljoin(base=image_domain, url=c.logo) if c.logo else image_domain + '/img/chain/base.png',
+            ))
+
+        tokens: dict[int, dict[str, Any]] = {}
+        for token in models.Coin.objects.using(alias='coin_source').only('id', 'name', 'symbol', 'slug', 'logo', 'market_cap').iterator(chunk_size=5000):
+            tokens[token.id] = dict(
+                name=token.name,
+                symbol=token.symbol,
+                slug=token.slug,
+                logo=urljoin(base=image_domain, url=token.logo),
+                market_cap=token.market_cap,
+                chain=chains.get(token.id, []),
+            )
+        return tokens
+
+    @classmethod
+    def refresh(cls) -> int:
+        """Write the tokens that changed since the last refresh to Redis; returns how many."""
+        tokens: dict[int, dict[str, Any]] = cls.snapshot()
+        redis = get_redis_connection(alias='default')
+        stored: dict[int, str] = {int(k): cls.fingerprint(token=json.loads(s=v)) for k, v in redis.hgetall(cls.tokens_key).items()}
+        changed: dict[int, str] = {
+            i: json.dumps(obj=token, sort_keys=True)
+            for i, token in tokens.items() if stored.get(i) != cls.fingerprint(token=token)
+        }
+        removed: list[int] = [i for i in stored if i not in tokens]
+        if not changed and not removed:
+            return 0
+
+        def publish(pipe) -> None:
+            # WATCH on the version turns the read-then-increment into compare-and-set: a concurrent refresh makes
+            # this MULTI fail and redis-py retries it with the new version. The version is published in the same
+            # MULTI as the rows, so a reader never sees it before the changes.
+            version: int = int(pipe.get(cls.version_key) or 0) + 1
+            floor: int = max(0, version - settings.COIN_INDEX_CHANGELOG_VERSIONS)
+            pipe.multi()
+            if changed:
+                pipe.hset(cls.tokens_key, mapping=changed)
+            if removed:
+                pipe.hdel(cls.tokens_key, *removed)
+            pipe.zadd(cls.changelog_key, {i: version for i in [*changed, *removed]})
+            pipe.zremrangebyscore(cls.changelog_key, '-inf', floor)
+            pipe.mset({cls.version_key: version, cls.floor_key: floor})
+
+        redis.transaction(publish, cls.version_key)
+        return len(changed) + len(removed)
@@ -0,0 +1,15 @@
+import logging
+
+from app.celery import app
+from celery.utils.log import get_task_logger
+
+from .search_index import CoinIndex
+
+logger: logging.Logger = get_task_logger(name=__name__)
+
+
+@app.task()
+def refresh_search_index() -> None:
+    changed: int = CoinIndex.refresh()
+    if changed:
+        logger.info(msg=f'Coin search index: {changed} tokens changed')
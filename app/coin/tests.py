@@ -0,0 +1,39 @@
+from typing import Any
+
+from django.test import SimpleTestCase
+
+from coin.search_index import SearchIndex
+
+
+def token(symbol: str, name: str, market_cap: float, *addresses: str) -> dict[str, Any]:
+    return dict(symbol=symbol, name=name, slug=name.lower(), logo=None, market_cap=market_cap, chain=[dict(address=a) for a in addresses])
+
+
+class SearchIndexTests(SimpleTestCase):
+    """SearchIndex must answer like the SQL search it replaced."""
+
+    def setUp(self) -> None:
+        self.index: SearchIndex = SearchIndex(tokens={
+            1: token('ETH', 'Ether', 1000, '0xAbC0000000000000000000000000000000000001'),
+            2: token('ETHX', 'Stader ETHx', 10, '0x0000000000000000000000000000000000abc002'),
+            3: token('USDC', 'USD Coin', 500, 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'),
+            4: token('BONK', 'Bonk', 100, 'Abc00BonkMint11111111111111111111111111111'),
+        })
+
+    def ids(self, kw: str) -> list[int]:
+        return [row['id'] for row in self.index.search(kw=kw)]
+
+    def test_symbol_before_name(self) -> None:
+        self.assertEqual(self.ids(kw='eth'), [1, 2])
+
+    def test_address_prefix(self) -> None:
+        self.assertEqual(self.ids(kw='0xabc'), [1])
+
+    def test_address_substring(self) -> None:
+        # icontains in the SQL: a fragment from the middle of an address still matches, case-insensitively.
+        self.assertEqual(self.ids(kw='abc002'), [2])
+        self.assertEqual(self.ids(kw='m2qn1xzy'), [3])
+
+    def test_prefix_matches_first(self) -> None:
+        # 'abc00' starts token 4's address and sits inside the other two, which sort before it.
+        self.assertEqual(self.index.match_address(kw='abc00', num=10), [4, 2, 1])
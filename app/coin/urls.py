@@ -10,6 +10,7 @@ urlpatterns: list[URLPattern] = [
     path(route="coin/info/", view=CoinInfoView.as_view(), name="coin-info-api"),
     path(route="coin/search/", view=CoinSearchView.as_view(), name="coin-search-api"),
     path(route="coin/query/", view=CoinQueryView.as_view(), name="coin-query-api"),
+    path(route="coin/search/federated/", view=FederatedSearchView.as_view(), name="coin-search-federated-api"),
     
     path(route="address/query/", view=AddressQueryView.as_view(), name="address-query-api"),
 ]
\ No newline at end of file
@@ -1,33 +1,43 @@
 import json
-import copy
 import asyncio
 from typing import Any
 
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models.manager import BaseManager
-from django.db.models.query import RawQuerySet
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-from django.db.models import Q
 
 from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
-from . import forms, models, serializers
+from . import forms, models, search, serializers
 import os
-from urllib.parse import urljoin
 from users import models as user_models
 from users.permissions import OptionalAuthentication
 
 from utils import constants
 from utils.response_util import ResponseUtil
+from utils.async_view import AsyncAPIView
+from utils.fetch import Fetcher, FetchResult
+from utils.http_pool import HttpPool
+from utils.single_flight import SingleFlight
 
 from w3.dex import GeckoAPI, DexTools, AveAPI, DefinedAPI
+from w3 import token_meta
+from w3.token_meta import TokenMetaStore
 from w3.wallet import WalletHandler
 
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
 
 class ChainView(APIView):
     @method_decorator(decorator=cache_page(timeout=5 * 60))
@@ -54,45 +64,8 @@ class CoinSearchView(APIView):
             return ResponseUtil.field_error(msg=list(form.errors.values())[0][0])
         kw: str = request.query_params['kw']
 
-        reserved_chars = r'''?&|!{}[]()^~*:\\"'+-'''
-        replace: list[str] = ['\\' + l for l in reserved_chars]
-        trans: dict[int, str] = str.maketrans(dict(zip(reserved_chars, replace)))
-        kw = str(object=kw).strip().translate(trans).replace('%', '')
-        
-        num: int = 10
         data: dict = dict()
-
-        sql: str = f"""
-        select id,name,symbol,logo 
-        from token 
-        where symbol ilike %s 
-        order by char_length(symbol) asc, strpos('{kw}',symbol) asc, market_cap desc 
-        limit {num};
-        """
-        objs: RawQuerySet[Any] = models.Coin.objects.using(alias='coin_source').raw(raw_query=sql, params=[f'%{kw}%'])
-        ser: serializers.CoinSearch = serializers.CoinSearch(objs, many=True)
-        ser_data: ReturnList | Any | ReturnDict = ser.data
-        tokens: list[int] = [t['id'] for t in ser_data]
-
-        full_objs: BaseManager[models.Coin] = models.Coin.objects.using(alias='coin_source').filter(Q(name__icontains = kw) | Q(slug__icontains = kw)).order_by('-market_cap')[:num]
-        full_ser: serializers.CoinSearch = serializers.CoinSearch(full_objs, many=True)
-        for fs in full_ser.data:
-            if fs['id'] in tokens:
-                continue
-            tokens.append(fs['id'])
-            ser_data.append(fs)
-
-        chain_objs: BaseManager[models.CoinChainData] = models.CoinChainData.objects.using(alias='coin_source').filter(address__icontains = kw)[:num]
-        for chain_obj in chain_objs:
-            try:
-                token: models.Coin = chain_obj.token
-                if token.id in tokens:
-                    continue
-                tokens.append(token.id)
-                ser_data.append(dict(id=token.id,name=token.name,symbol=token.symbol,logo=urljoin(base=os.getenv(key='IMAGE_DOMAIN'), url=token.logo)))
-            except:
-                continue
-        data['coin'] = ser_data[:num]
+        data['coin'] = search.local_search(kw=kw)
         return ResponseUtil.success(data=data)
 
 
@@ -125,11 +98,17 @@ class CoinListView(APIView):
         return ResponseUtil.success(data=dict(list=token_data))
     
 
-class CoinInfoView(APIView):
+class CoinInfoView(AsyncAPIView):
+    """Token info composed from TokenMetaStore; stale field classes are fetched from every vendor at once.
+
+    The response waits at most COIN_INFO_DEADLINE seconds. Fields whose
+    vendor call has not answered by then are listed in `missing` with
+    `partial` set; the late calls keep running and fill the store.
+    """
     permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
+    _late_tasks: set[asyncio.Task] = set()
 
-    @method_decorator(decorator=cache_page(timeout=1 * 60))
-    def get(self, request: Request) -> Response:
+    async def get(self, request: Request) -> Response:
         form: forms.CoinInfoForms = forms.CoinInfoForms(data=request.query_params)
         if not form.is_valid():
             return ResponseUtil.field_error(msg=list(form.errors.values())[0][0])
@@ -141,17 +120,66 @@ class CoinInfoView(APIView):
         data: dict[str, Any] = dict()
         chain_gecko: str | None = constants.CHAIN_DICT.get(chain, {}).get('gecko')
         chain_dex_tools: str | None = constants.CHAIN_DICT.get(chain, {}).get('dex_tools')
-        if chain_gecko:
-            gecko_data: dict = GeckoAPI.token_info(chain=chain_gecko, address=address)
-            data = dict(data, **gecko_data)
-        else:
+        if not chain_gecko:
             return ResponseUtil.success(data=data)
-        if chain_dex_tools:
-            dex_tools_data: dict = DexTools.token_info(chain=chain_dex_tools, address=address)
-            data['holders'] = dex_tools_data.get('holders')
-        else:
-            data['holders'] = None
+
+        fields: list[str] = list(token_meta.FIELD_CLASS_OF)
+        data, stale = await TokenMetaStore.aget(chain=chain, address=address, fields=fields)
+        if stale:
+            # Coalesced across requests and workers; followers get the leader's answer, late fields included by then.
+            data.update(await SingleFlight.run(
+                f'coin_info:{chain}:{address}:{",".join(sorted(stale))}',
+                self.fetch,
+                ttl=settings.COIN_INFO_DEADLINE + 1,
+                chain=chain, address=address, stale=stale, chain_gecko=chain_gecko, chain_dex_tools=chain_dex_tools,
+            ))
+        missing: list[str] = [field for field in fields if field not in data]
+        data = {field: data.get(field) for field in fields}
+        data.update(partial=bool(missing), missing=missing)
         return ResponseUtil.success(data=data)
+
+    @classmethod
+    async def fetch(cls, chain: str, address: str, stale: list[str], chain_gecko: str, chain_dex_tools: str | None) -> dict[str, Any]:
+        # base carries fields of both classes; info is static only, pools and holders are market only.
+        parts: list[str] = ['base'] + (['info'] if token_meta.STATIC in stale else []) + (['pools'] if token_meta.MARKET in stale else [])
+        urls: dict[str, str] = GeckoAPI.token_urls(chain=chain_gecko, address=address)
+        session: aiohttp.ClientSession = HttpPool.session()
+
+        async def gecko(part: str) -> dict[str, Any]:
+            result: FetchResult = await Fetcher.fetch(url=urls[part], headers=GeckoAPI.headers, session=session)
+            return GeckoAPI.parse_token_part(part=part, res=result.data) if result.ok and isinstance(result.data, dict) else {}
+
+        async def holders() -> dict[str, Any]:
+            if not chain_dex_tools:
+                return dict(holders=None)
+            result: FetchResult = await Fetcher.fetch(url=DexTools.token_info_url(chain=chain_dex_tools, address=address), headers=DexTools.headers, session=session)
+            info: dict[str, Any] = (result.data.get('data') or {}) if result.ok and isinstance(result.data, dict) else {}
+            # A miss is cached as None too, otherwise the market class would never be complete and always refetched.
+            return dict(holders=info.get('holders'))
+
+        tasks: list[asyncio.Task] = [asyncio.create_task(gecko(part=part)) for part in parts]
+        if token_meta.MARKET in stale:
+            tasks.append(asyncio.create_task(holders()))
+        done, pending = await asyncio.wait(tasks, timeout=settings.COIN_INFO_DEADLINE)
+
+        data: dict[str, Any] = dict()
+        for task in done:
+            if task.exception() is None:
+                data.update(task.result())
+        await TokenMetaStore.aput(chain=chain, address=address, data=data)
+        if pending:
+            late: asyncio.Task = asyncio.create_task(cls.fill_late(chain=chain, address=address, tasks=pending))
+            cls._late_tasks.add(late)
+            late.add_done_callback(cls._late_tasks.discard)
+        return data
+
+    @staticmethod
+    async def fill_late(chain: str, address: str, tasks: set[asyncio.Task]) -> None:
+        for task in asyncio.as_completed(tasks):
+            try:
+                await TokenMetaStore.aput(chain=chain, address=address, data=await task)
+            except Exception as e:
+                logger.warning(msg=f'Token info late fill error {chain} {address}: {e}')
     
 
 class PoolSearchView(APIView):
@@ -174,7 +202,6 @@ class PoolSearchView(APIView):
     
 
 class CoinQueryView(APIView):
-    @method_decorator(decorator=cache_page(timeout=1 * 60))
     def get(self, request: Request) -> Response:
         form: forms.CoinSearchForms = forms.CoinSearchForms(data=request.query_params)
         if not form.is_valid():
@@ -185,28 +212,51 @@ class CoinQueryView(APIView):
         return ResponseUtil.success(data=data)
     
 
-class AddressQueryView(APIView):
-    @method_decorator(decorator=cache_page(timeout=1 * 60))
-    def get(self, request: Request) -> Response:
+class FederatedSearchView(AsyncAPIView):
+    permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
+
+    async def get(self, request: Request) -> Response:
+        form: forms.CoinSearchForms = forms.CoinSearchForms(data=request.query_params)
+        if not form.is_valid():
+            return ResponseUtil.field_error(msg=list(form.errors.values())[0][0])
+        kw: str = request.query_params['kw']
+
+        data: dict[str, Any] = await search.FederatedSearch.search(kw=kw)
+        return ResponseUtil.success(data=data)
+    
+
+class AddressQueryView(AsyncAPIView):
+    async def get(self, request: Request) -> Response:
         form: forms.AddressQueryForms = forms.AddressQueryForms(data=request.query_params)
         if not form.is_valid():
             return ResponseUtil.field_error(msg=list(form.errors.values())[0][0])
         address: str = request.query_params['address']
         addr_type: str | None = request.query_params.get('type')
-        chains: dict[str, dict[str, str]] = copy.deepcopy(constants.CHAIN_DICT)
-        excluded_chains: dict[str, dict[str, str]] = chains
+
+        cache_key: str = f'satoshi:address_query:{address}:{addr_type or ""}'
+        data: dict[str, Any] | None = await cache.aget(key=cache_key)
+        if data is not None:
+            return ResponseUtil.success(data=data)
+
+        excluded_chains: list[str] = list(constants.CHAIN_DICT.keys())
         token_data: dict[str, Any] = dict()
         account_data: dict[str, Any] = dict()
+        token_task: asyncio.Task | None = None
         
         if not addr_type or addr_type == 'token':
-            token_data: list[dict] = DefinedAPI.search(kw=address)
+            token_task = asyncio.create_task(sync_to_async(DefinedAPI.search, thread_sensitive=False)(kw=address))
         
         if not addr_type or addr_type == 'account':
             wallet_handler: WalletHandler = WalletHandler()
-            address_type_res: dict = asyncio.run(main=wallet_handler.multi_account_type_exclude_token(address=address, chain_list=excluded_chains))
+            address_type_res: dict = await wallet_handler.multi_account_type_exclude_token(address=address, chain_list=excluded_chains)
 
             chains_for_account: list = [k for k, v in address_type_res.items() if v == 'user']
-            balance_for_account: dict = asyncio.run(main=wallet_handler.multi_get_balances(address_list=[address], chain_list=chains_for_account))
+            balance_for_account: dict = await wallet_handler.multi_get_balances(address_list=[address], chain_list=chains_for_account)
             account_data = {k:v[address] if len(v) else v for k, v in balance_for_account.items()}
 
-        return ResponseUtil.success(data=dict(tokens=token_data, accounts=account_data))
+        if token_task:
+            token_data: list[dict] = await token_task
+
+        data = dict(tokens=token_data, accounts=account_data)
+        await cache.aset(key=cache_key, value=data, timeout=1 * 60)
+        return ResponseUtil.success(data=data)
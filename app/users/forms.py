@@ -16,6 +16,50 @@ class WalletTransactionForms(forms.Form):
             raise forms.ValidationError('Chain error')
 
 
+class BalanceFilterForms(forms.Form):
+    min_value_usd = forms.FloatField(min_value=0, required=False)
+    exclude_spam = forms.BooleanField(required=False)
+    top = forms.IntegerField(min_value=1, max_value=1000, required=False)
+
+
+class BulkImportForms(forms.Form):
+    wallets = forms.JSONField(required=True)
+
+    def clean_wallets(self):
+        wallets = self.cleaned_data.get('wallets')
+        if not isinstance(wallets, list) or not wallets:
+            raise forms.ValidationError('Must a list')
+        if len(wallets) > WALLET_IMPORT_MAX:
+            raise forms.ValidationError(f'At most {WALLET_IMPORT_MAX} wallets')
+
+        for item in wallets:
+            if not isinstance(item, dict) or not isinstance(item.get('private_key'), str):
+                raise forms.ValidationError('Must have private_key')
+            if item.get('platform') and item['platform'] not in PLATFORM_LIST:
+                raise forms.ValidationError('Platform error')
+            if item.get('name') and len(str(item['name'])) > 100:
+                raise forms.ValidationError('name: wrong format')
+        return wallets
+
+
+class HashStatusBatchForms(forms.Form):
+    hashes = forms.JSONField(required=True)
+
+    def clean_hashes(self):
+        hashes = self.cleaned_data.get('hashes')
+        if not isinstance(hashes, list) or not hashes:
+            raise forms.ValidationError('Must a list')
+        if len(hashes) > HASH_STATUS_BATCH_MAX:
+            raise forms.ValidationError(f'At most {HASH_STATUS_BATCH_MAX} hashes')
+
+        for item in hashes:
+            if not isinstance(item, dict) or not isinstance(item.get('hash_tx'), str):
+                raise forms.ValidationError('Must have hash_tx')
+            if item.get('chain', DEFAULT_CHAIN) not in CHAIN_DICT:
+                raise forms.ValidationError('Chain error')
+        return hashes
+
+
 class UserSelectForms(forms.Form):
     ids: list[dict] = forms.JSONField(required=True)
     status: int = forms.IntegerField(required=True)
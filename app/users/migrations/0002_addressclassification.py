@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AddressClassification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.CharField(max_length=30)),
+                ("address", models.CharField(max_length=130)),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("user", "user"),
+                            ("contract", "contract"),
+                            ("token", "token"),
+                            ("unknown", "unknown"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "users_address_classification",
+                "unique_together": {("chain", "address")},
+            },
+        ),
+    ]
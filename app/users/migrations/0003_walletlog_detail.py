@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_addressclassification"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="walletlog",
+            name="hash_tx",
+            field=models.CharField(blank=True, max_length=128, null=True),
+        ),
+        migrations.AddField(
+            model_name="walletlog",
+            name="detail",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+def backfill_submitted_at(apps, schema_editor) -> None:
+    WalletLog = apps.get_model("users", "WalletLog")
+    WalletLog.objects.filter(submitted_at__isnull=True, hash_tx__isnull=False).update(submitted_at=models.F("added_at"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_walletlog_detail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="walletlog",
+            name="submitted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(code=backfill_submitted_at, reverse_code=migrations.RunPython.noop),
+    ]
@@ -86,21 +86,51 @@ class Wallet(models.Model):
     
 
 class WalletLog(models.Model):
+    # type_id: 0 swap, 1 create token, 2 mint, 3 cross-chain
+    STATUS_PENDING: int = 0
+    STATUS_SUCCESS: int = 1
+    STATUS_TIMEOUT: int = 2
+    STATUS_FAILED: int = 3
+    STATUS_QUEUED: int = 4          # async submission waiting for the transactions worker
+    STATUS_SUBMIT_FAILED: int = 5   # the worker could not sign/broadcast; see detail['error']
+    STATUS_SUBMITTING: int = 6      # claimed by the transactions worker, not broadcast yet
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
     chain = models.CharField(max_length=30, blank=True, null=True)
     input_token = models.CharField(max_length=128, blank=True, null=True)
     output_token = models.CharField(max_length=128, blank=True, null=True)
     amount = models.FloatField()
-    hash_tx = models.CharField(max_length=128)
+    hash_tx = models.CharField(max_length=128, blank=True, null=True)
     type_id = models.SmallIntegerField(blank=True, null=True)
     status = models.SmallIntegerField(blank=True, null=True)
+    detail = models.JSONField(blank=True, null=True)
     user = models.ForeignKey('User', on_delete=models.CASCADE)
     added_at = models.DateTimeField(auto_now_add=True)
+    # When the worker started submitting (then broadcasting) it; the reconciler's timeout counts from here, not from queueing.
+    submitted_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         db_table: str = 'users_wallet_log'
         unique_together: tuple[tuple[Literal['hash_tx'], Literal['chain']]] = (('hash_tx', 'chain'),)
 
+
+class AddressClassification(models.Model):
+    TYPE_CHOICES: list = [
+        ("user", "user"),
+        ("contract", "contract"),
+        ("token", "token"),
+        ("unknown", "unknown"),
+    ]
+
+    chain = models.CharField(max_length=30)
+    address = models.CharField(max_length=130)
+    type = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table: str = 'users_address_classification'
+        unique_together: tuple[tuple[Literal['chain'], Literal['address']]] = (('chain', 'address'),)
+
  
 class UserSubscription(models.Model):
     id = models.UUIDField(
@@ -0,0 +1,120 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.utils import timezone
+from prometheus_client import Counter, Gauge, Histogram
+
+from users.models import WalletLog
+from users.status_events import publish_status
+from w3.wallet import WalletHandler
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+RECONCILE_CHECKED: Counter = Counter('tx_reconcile_checked_total', 'Pending transactions checked against the chain services.', ['chain'])
+RECONCILE_TRANSITIONS: Counter = Counter('tx_reconcile_transitions_total', 'Transaction status transitions applied by the reconciler.', ['status'])
+RECONCILE_LAG: Gauge = Gauge('tx_reconcile_lag_seconds', 'Age of the oldest pending transaction at the start of a run.')
+RECONCILE_DURATION: Histogram = Histogram('tx_reconcile_duration_seconds', 'Duration of one reconciler run.')
+
+# Shared by every run; one slot for the EVM batch call, one for Solana.
+_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='reconciler')
+
+
+def sent_at(obj: WalletLog) -> int:
+    # Rows written before submitted_at existed only have added_at.
+    return int((obj.submitted_at or obj.added_at).timestamp())
+
+
+def hash_status(res: dict[str, Any]) -> int | None:
+    if res.get('isPending') == False and res.get('isSuccess') == True: # succeed
+        return WalletLog.STATUS_SUCCESS
+    elif res.get('isPending') == False and res.get('isSuccess') == False: # failed
+        return WalletLog.STATUS_FAILED
+    return None
+
+
+class Reconciler():
+    """Moves pending WalletLogs to success/failed/timeout in bulk.
+
+    Pending rows are read in keyset pages of RECONCILE_PAGE_SIZE ordered by
+    id. For each page the EVM chains go out as one multi_check_hash call and
+    Solana as one check_hash call, concurrently, and the transitions are
+    written with one UPDATE per target status and published to the owners
+    (users.status_events). Rows still pending RECONCILE_TIMEOUT after
+    submission become status 2, as check_hash did; async jobs whose worker
+    died before broadcasting (still SUBMITTING by then) become status 5.
+    """
+
+    def __init__(self) -> None:
+        self.wallet_handler: WalletHandler = WalletHandler()
+
+    def run(self) -> dict[int, int]:
+        with RECONCILE_DURATION.time():
+            cutoff: datetime = timezone.now() - timedelta(seconds=settings.RECONCILE_TIMEOUT)
+            pending = WalletLog.objects.filter(status=WalletLog.STATUS_PENDING, hash_tx__isnull=False)
+
+            oldest: WalletLog | None = pending.order_by('submitted_at').only('submitted_at').first()
+            RECONCILE_LAG.set((timezone.now() - oldest.submitted_at).total_seconds() if oldest else 0)
+
+            totals: dict[int, int] = {}
+            timed_out: list[WalletLog] = list(pending.filter(submitted_at__lt=cutoff).only('id', 'user_id', 'chain', 'hash_tx'))
+            self.apply(transitions={WalletLog.STATUS_TIMEOUT: timed_out}, totals=totals)
+            # Whether a lost worker broadcast anything is unknown; the user has to check and resubmit.
+            stranded: list[WalletLog] = list(WalletLog.objects.filter(status=WalletLog.STATUS_SUBMITTING, submitted_at__lt=cutoff).only('id', 'user_id', 'chain', 'hash_tx'))
+            self.apply(transitions={WalletLog.STATUS_SUBMIT_FAILED: stranded}, totals=totals, current=(WalletLog.STATUS_SUBMITTING,))
+
+            page_qs = pending.filter(submitted_at__gte=cutoff).order_by('id').only('id', 'user_id', 'chain', 'hash_tx', 'added_at', 'submitted_at')
+            last_id: Any = None
+            while True:
+                page: list[WalletLog] = list((page_qs.filter(id__gt=last_id) if last_id else page_qs)[:settings.RECONCILE_PAGE_SIZE])
+                if not page:
+                    break
+                last_id = page[-1].id
+                self.apply(transitions=self.check_page(page=page), totals=totals)
+            return totals
+
+    def check_page(self, page: list[WalletLog]) -> dict[int, list[WalletLog]]:
+        by_chain: dict[str, list[WalletLog]] = {}
+        for obj in page:
+            by_chain.setdefault(obj.chain, []).append(obj)
+
+        sol_objs: list[WalletLog] = by_chain.pop('solana', [])
+        sol_future: Future | None = _executor.submit(
+            self.wallet_handler.check_hash,
+            chain='solana',
+            data_list=[dict(trxHash=obj.hash_tx, trxTimestamp=sent_at(obj=obj)) for obj in sol_objs],
+        ) if sol_objs else None
+        evm_future: Future | None = _executor.submit(
+            self.wallet_handler.multi_check_hash,
+            hash_data={chain: [dict(trxHash=obj.hash_tx, trxTimestamp=sent_at(obj=obj)) for obj in objs] for chain, objs in by_chain.items()},
+        ) if by_chain else None
+
+        results: dict[str, list] = {}
+        if sol_future:
+            results['solana'] = sol_future.result() or []
+            by_chain['solana'] = sol_objs
+        if evm_future:
+            results.update(evm_future.result() or {})
+
+        transitions: dict[int, list[WalletLog]] = {}
+        for chain, objs in by_chain.items():
+            RECONCILE_CHECKED.labels(chain=chain).inc(len(objs))
+            # The chain services answer in request order.
+            for obj, res in zip(objs, results.get(chain) or []):
+                status: int | None = hash_status(res=res or {})
+                if status is not None:
+                    transitions.setdefault(status, []).append(obj)
+        return transitions
+
+    def apply(self, transitions: dict[int, list[WalletLog]], totals: dict[int, int], current: tuple[int, ...]=(WalletLog.STATUS_PENDING,)) -> None:
+        for status, objs in transitions.items():
+            if not objs:
+                continue
+            # Guarded on the current status so a concurrent writer's result is never overwritten.
+            updated: int = WalletLog.objects.filter(pk__in=[obj.id for obj in objs], status__in=current).update(status=status)
+            totals[status] = totals.get(status, 0) + updated
+            RECONCILE_TRANSITIONS.labels(status=str(status)).inc(updated)
+            publish_status(logs=objs, status=status)
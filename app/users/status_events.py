@@ -0,0 +1,47 @@
+from typing import Any, Iterable
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django_redis import get_redis_connection
+
+from users.models import WalletLog
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+CHANNEL_PREFIX: str = 'satoshi:tx_status'
+
+
+def channel(user_id: Any) -> str:
+    return f'{CHANNEL_PREFIX}:{user_id}'
+
+
+def status_event(log: WalletLog, status: int) -> dict[str, Any]:
+    return dict(id=str(log.id), chain=log.chain, hash_tx=log.hash_tx, status=status)
+
+
+def publish_status(logs: Iterable[WalletLog], status: int) -> None:
+    """Announce a status change to the owners: Redis pub/sub for long-polls, the user_<id> group for websockets."""
+    by_user: dict[str, list[dict[str, Any]]] = {}
+    for log in logs:
+        by_user.setdefault(str(log.user_id), []).append(status_event(log=log, status=status))
+    if not by_user:
+        return
+
+    try:
+        pipe = get_redis_connection(alias='default').pipeline(transaction=False)
+        for user_id, events in by_user.items():
+            for event in events:
+                pipe.publish(channel(user_id=user_id), json.dumps(obj=event))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(msg=f'Status publish error: {e}')
+
+    try:
+        channel_layer = get_channel_layer()
+        for user_id, events in by_user.items():
+            async_to_sync(channel_layer.group_send)(f'user_{user_id}', {'type': 'tx_status', 'data': events})
+    except Exception as e:
+        logger.warning(msg=f'Status push error: {e}')
@@ -0,0 +1,67 @@
+from typing import Any, AsyncIterator
+import json
+import time
+
+from django.http import StreamingHttpResponse
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from w3.wallet import WalletHandler
+
+
+class BalanceStream():
+    """Streams multi-chain balances record by record as each (chain, wallet) fetch completes.
+
+    NDJSON by default; `?stream=sse` switches to Server-Sent Events. Every
+    balance record is followed by one final `summary` record.
+    """
+
+    @classmethod
+    def response(cls, request: Request, address_list: list[str], chain_list: list[str], rows: dict[str, dict] | None = None) -> StreamingHttpResponse:
+        sse: bool = request.query_params.get('stream') == 'sse'
+        records: AsyncIterator[dict[str, Any]] = cls.records(address_list=address_list, chain_list=chain_list, rows=rows)
+        response = StreamingHttpResponse(
+            streaming_content=cls.encode(records=records, sse=sse),
+            content_type='text/event-stream' if sse else 'application/x-ndjson',
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    async def records(address_list: list[str], chain_list: list[str], rows: dict[str, dict] | None) -> AsyncIterator[dict[str, Any]]:
+        start: float = time.perf_counter()
+        count: int = 0
+        value: float = 0
+        wallet_handler: WalletHandler = WalletHandler()
+        async for chain, address, json_data in wallet_handler.iter_balances(address_list=address_list, chain_list=chain_list):
+            count += 1
+            value += json_data.get('value') or 0
+            if rows is None:
+                data: dict[str, Any] = json_data
+            else:
+                data = dict(
+                    rows[address],
+                    value=json_data.get('value', 0),
+                    tokens=json_data.get('tokens', []),
+                    chain=json_data.get('chain'),
+                    meta=json_data.get('meta'),
+                )
+            yield dict(type='balance', chain=chain, address=address, data=data)
+        yield dict(
+            type='summary',
+            chains=len(chain_list),
+            wallets=len(address_list),
+            count=count,
+            value=value,
+            elapsed_ms=int((time.perf_counter() - start) * 1000),
+        )
+
+    @staticmethod
+    async def encode(records: AsyncIterator[dict[str, Any]], sse: bool) -> AsyncIterator[str]:
+        async for record in records:
+            payload: str = json.dumps(obj=record, cls=JSONEncoder, ensure_ascii=False)
+            if sse:
+                yield f"event: {record['type']}\ndata: {payload}\n\n"
+            else:
+                yield payload + '\n'
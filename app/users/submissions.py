@@ -0,0 +1,187 @@
+from typing import Any, Callable
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status as status_code
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from app.celery import app
+from users.models import Wallet, WalletLog
+from utils import constants
+from utils.response_util import ResponseUtil
+from w3.wallet import WalletHandler
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+class SubmissionError(Exception):
+    def __init__(self, msg: str='Web3 request error.', status: int=status_code.HTTP_421_MISDIRECTED_REQUEST, code: int | None=None, data: dict | None=None) -> None:
+        super().__init__(msg)
+        self.msg: str = msg
+        self.status: int = status
+        self.code: int = code if code is not None else status
+        self.data: dict | None = data
+
+    def response(self) -> Response:
+        return ResponseUtil.custom(status=self.status, code=self.code, data=self.data, msg=self.msg)
+
+
+def submit_swap(wallet: Wallet, chain: str, params: dict[str, Any]) -> dict[str, Any]:
+    transaction_hash: str | None = WalletHandler().token_transaction(
+        chain=chain,
+        private_key=wallet.private_key,
+        input_token=params['input_token'],
+        output_token=params['output_token'],
+        amount=params['amount'],
+        slippageBps=params.get('slippageBps', 10) * 100,
+    )
+    if not transaction_hash:
+        raise SubmissionError()
+    return dict(hash_tx=transaction_hash)
+
+
+def submit_create(wallet: Wallet, chain: str, params: dict[str, Any]) -> dict[str, Any]:
+    created_hash, address = WalletHandler().create_token(
+        chain=chain,
+        private_key=wallet.private_key,
+        name=params['name'],
+        symbol=params['symbol'],
+        desc=params.get('desc', ''),
+        decimals=str(object=params['decimals']),
+        amount=str(object=params.get('amount') or 0),
+    )
+    if not created_hash:
+        raise SubmissionError()
+    return dict(hash_tx=created_hash, address=address)
+
+
+def submit_mint(wallet: Wallet, chain: str, params: dict[str, Any]) -> dict[str, Any]:
+    wallet_handler: WalletHandler = WalletHandler()
+    created_hash: str = params['created_hash']
+    check_res: list | None = wallet_handler.check_hash(chain=chain, data_list=[dict(trxHash=created_hash, trxTimestamp=params['created_at'])])
+    if not (check_res and check_res[0].get('isPending') == False and check_res[0].get('isSuccess') == True): # succeed
+        raise SubmissionError(msg='Hash status error.')
+
+    address: None | str = wallet_handler.get_address_from_hash(chain=chain, hash_tx=created_hash)
+    mint_hash: str | None = wallet_handler.mint_token(chain=chain, private_key=wallet.private_key, create_hash=created_hash, mint_amount=str(object=params['amount']))
+    if not mint_hash:
+        raise SubmissionError()
+    return dict(hash_tx=mint_hash, address=address)
+
+
+def submit_cross(wallet: Wallet, chain: str, params: dict[str, Any]) -> dict[str, Any]:
+    # The secret key is added here only, so it never lands in WalletLog.detail.
+    form_data: dict[str, Any] = dict(params, fromData=dict(params['fromData'], walletSecretKey=wallet.private_key, walletAddress=wallet.address))
+    status, resp = WalletHandler().token_cross(form_data=form_data)
+    if status != 200 or resp.get('code') != 200:
+        raise SubmissionError(msg=resp.get('message'), status=status, code=resp.get('code'), data=resp.get('data'))
+    return dict(hash_tx=resp.get('data', {}).get('trx_hash'), provider=params.get('provider'))
+
+
+SUBMITTERS: dict[int, Callable[[Wallet, str, dict[str, Any]], dict[str, Any]]] = {
+    0: submit_swap,
+    1: submit_create,
+    2: submit_mint,
+    3: submit_cross,
+}
+
+
+def wants_async(request: Request) -> bool:
+    return str(request.query_params.get('async', '')).lower() in ('1', 'true')
+
+
+def job_data(log: WalletLog) -> dict[str, Any]:
+    detail: dict[str, Any] = log.detail or {}
+    data: dict[str, Any] = dict(
+        job_id=str(log.id),
+        type_id=log.type_id,
+        chain=log.chain,
+        status=log.status,
+        hash_tx=log.hash_tx,
+        url=constants.CHAIN_DICT[log.chain]['tx_url'] + log.hash_tx if log.hash_tx and log.chain in constants.CHAIN_DICT else None,
+    )
+    data.update(detail.get('result', {}))
+    if detail.get('error'):
+        data['error'] = detail['error']
+    return data
+
+
+def notify_job(log: WalletLog) -> None:
+    try:
+        async_to_sync(get_channel_layer().group_send)(f'user_{log.user_id}', {'type': 'job_status', 'data': job_data(log=log)})
+    except Exception as e:
+        logger.warning(msg=f'Job notify error {log.id}: {e}')
+
+
+def submit(request: Request, type_id: int, wallet: Wallet, chain: str, params: dict[str, Any], log_fields: dict[str, Any]) -> tuple[WalletLog, dict[str, Any]] | Response:
+    """Sign and broadcast now, or queue it for the transactions worker with `?async=true`.
+
+    Returns (log, submitter result) when done inline, otherwise the response
+    to send as is: 202 with the job, or the upstream error.
+    """
+    if wants_async(request=request):
+        log: WalletLog = WalletLog.objects.create(
+            **log_fields,
+            hash_tx=None,
+            type_id=type_id,
+            status=WalletLog.STATUS_QUEUED,
+            user=wallet.user,
+            detail=dict(wallet_id=str(wallet.id), params=params),
+        )
+        transaction.on_commit(lambda: app.send_task('users.tasks.submit_transaction', args=[str(log.id)]))
+        return ResponseUtil.custom(status=status_code.HTTP_202_ACCEPTED, code=status_code.HTTP_202_ACCEPTED, data=job_data(log=log), msg='Accepted')
+
+    try:
+        result: dict[str, Any] = SUBMITTERS[type_id](wallet, chain, params)
+    except SubmissionError as e:
+        return e.response()
+    if type_id == 1:
+        log_fields = dict(log_fields, input_token=result.get('address'))
+    log = WalletLog.objects.create(
+        **log_fields,
+        hash_tx=result['hash_tx'],
+        type_id=type_id,
+        status=WalletLog.STATUS_PENDING,
+        user=wallet.user,
+        submitted_at=timezone.now(),
+    )
+    return log, result
+
+
+def run_job(log_id: str) -> None:
+    """Worker side of an async submission; runs at most once per job.
+
+    The job is SUBMITTING while it is signed and broadcast and only becomes
+    PENDING together with its hash, so the reconciler never sees a pending
+    row without one. A worker dying in between leaves it SUBMITTING until
+    the reconciler gives up on it.
+    """
+    updated: int = WalletLog.objects.filter(pk=log_id, status=WalletLog.STATUS_QUEUED).update(status=WalletLog.STATUS_SUBMITTING, submitted_at=timezone.now())
+    if not updated:
+        return
+    log: WalletLog = WalletLog.objects.get(pk=log_id)
+    detail: dict[str, Any] = log.detail or {}
+    try:
+        wallet: Wallet = Wallet.objects.get(pk=detail['wallet_id'], user_id=log.user_id)
+        result: dict[str, Any] = SUBMITTERS[log.type_id](wallet, log.chain, detail['params'])
+    except SubmissionError as e:
+        log.status = WalletLog.STATUS_SUBMIT_FAILED
+        log.detail = dict(detail, error=dict(status=e.status, code=e.code, message=e.msg, data=e.data))
+    except Exception as e:
+        logger.error(msg=f'Job {log_id} error: {e}')
+        log.status = WalletLog.STATUS_SUBMIT_FAILED
+        log.detail = dict(detail, error=dict(message=str(e)))
+    else:
+        log.status = WalletLog.STATUS_PENDING
+        log.submitted_at = timezone.now()
+        log.hash_tx = result['hash_tx']
+        if log.type_id == 1:
+            log.input_token = result.get('address')
+        log.detail = dict(detail, result={k: v for k, v in result.items() if k != 'hash_tx'})
+    log.save()
+    notify_job(log=log)
@@ -8,16 +8,22 @@ urlpatterns: list[URLPattern] = [
     path(route="mine/", view=MineView.as_view(), name="mine"),
 
     path(route='import-key/', view=ImportPrivateKeyView.as_view(), name='import-private-key'),
+    path(route='import-key/bulk/', view=BulkImportPrivateKeyView.as_view(), name='import-private-key-bulk'),
     path(route='export-key/<str:pk>/', view=ExportPrivateKeyView.as_view(), name='export-private-key'),
     path(route='update-wallet-name/<str:pk>/', view=UpdateWalletNameView.as_view(), name='update-wallet-name'),
     path(route='wallet-delete/<str:pk>/', view=DeleteWalletView.as_view(), name='wallet-delete'),
     path(route='wallet-balance/<str:address>/', view=WalletBalanceAPIView.as_view(), name='wallet-balance'),
+    path(route='wallet-balance/<str:address>/stream/', view=WalletBalanceStreamAPIView.as_view(), name='wallet-balance-stream'),
     path(route='wallet/', view=WalletAPIView.as_view(), name='wallet-api'),
+    path(route='wallet/stream/', view=WalletStreamAPIView.as_view(), name='wallet-api-stream'),
 
     path(route='account/type/', view=AccountTypeView.as_view(), name='account-type'),
     path(route='coin/select/', view=UserSelectView.as_view(),  name='coin-select'),
 
     path(route='hash/status/', view=HashStatusAPIView.as_view(),  name='hash-status'),
+    path(route='hash/status/wait/', view=HashStatusWaitAPIView.as_view(),  name='hash-status-wait'),
+    path(route='hash/status/batch/', view=HashStatusBatchAPIView.as_view(),  name='hash-status-batch'),
+    path(route='job/<str:pk>/', view=JobStatusAPIView.as_view(),  name='job-status'),
     path(route='wallet-transaction/<str:pk>/', view=WalletTransactionView.as_view(), name='wallet-transaction'),
     path(route='coin/create/<str:pk>/', view=CreateTokenView.as_view(),  name='coin-create'),
     path(route='coin/mint/<str:pk>/', view=MintTokenView.as_view(),  name='coin-mint'),
@@ -1,24 +1,26 @@
 from datetime import datetime
 from typing import Any, Literal, Never
-import base58
+import asyncio
+import hashlib
 import json
 import os
+import re
+import time
 from django.db.models.manager import BaseManager
-import requests
-import copy
 import uuid
-import asyncio
-
-from eth_keys import keys
-from nacl.signing import SigningKey
 
 from rest_framework import generics
-from rest_framework.utils.serializer_helpers import ReturnDict
+from rest_framework.utils.serializer_helpers import ReturnList
 from .models import User, Wallet, WalletLog
 from .serializers import *
+from .streams import BalanceStream
 from django.shortcuts import get_object_or_404
-from django.db import transaction
-from . import forms
+from django.http import StreamingHttpResponse
+from django.conf import settings
+from django.core.cache import cache
+from . import forms, status_events, submissions
+from .status_events import publish_status
+from .reconciler import Reconciler, sent_at
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 
@@ -26,9 +28,15 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
 from w3.wallet import WalletHandler
+from w3.keys import derive_keys, derive_many
+from w3.balances import BalanceFilter, summarize
 from w3.dex import DexTools
 from utils import constants
 from utils.response_util import ResponseUtil
+from utils.async_view import AsyncAPIView
+from utils.idempotency import idempotent
+from utils.http_pool import HttpPool
+from utils.redis_pool import RedisSubscriber
 from rest_framework.request import Request
 from rest_framework.response import Response
 
@@ -56,40 +64,66 @@ class MineView(APIView):
         return ResponseUtil.success(data={"id": id, "email": email})
 
 
-class WalletAPIView(APIView):
+class WalletAPIView(AsyncAPIView):
     permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
 
     # @method_decorator(cache_page(30))
-    def get(self, request: Request) -> Response:
+    async def get(self, request: Request) -> Response:
         chains: str | None = request.query_params.get('chain')
-        all_chains: dict[str, dict[str, str]] = copy.deepcopy(x=constants.CHAIN_DICT)
         if not chains:
-            chains: list[str] = all_chains.keys()
+            chains: list[str] = list(constants.CHAIN_DICT.keys())
         else:
             chains: list[str] = [c.strip() for c in chains.split(sep=',') if c]
             for c in chains:
-                if c not in all_chains:
+                if c not in constants.CHAIN_DICT:
                     return ResponseUtil.field_error(msg=f'Chain {c} error.')
-        wallets: BaseManager[Wallet] = Wallet.objects.filter(user=request.user)
+        form: forms.BalanceFilterForms = forms.BalanceFilterForms(data=request.query_params)
+        if not form.is_valid():
+            return ResponseUtil.field_error(msg=list(form.errors.values())[0][0])
+        balance_filter: BalanceFilter = BalanceFilter(**form.cleaned_data)
+        wallets: list[Wallet] = [w async for w in Wallet.objects.filter(user=request.user)]
+        if request.query_params.get('view') == 'summary':
+            return ResponseUtil.success(data=await self.summary(user_id=request.user.id, wallets=wallets, chains=chains))
         serializer: WalletListSerializer = WalletListSerializer(wallets, many=True)
         wallet_handler: WalletHandler = WalletHandler()
 
-        balance_for_account: dict[str, dict[str, dict]] = asyncio.run(main=wallet_handler.multi_get_balances(address_list=[s['address'] for s in serializer.data], chain_list=chains))
+        balance_for_account: dict[str, dict[str, dict]] = await wallet_handler.multi_get_balances(address_list=[s['address'] for s in serializer.data], chain_list=chains)
+        # Shallow per-chain merge: the serializer rows are shared read-only, only the balance keys differ.
+        rows: ReturnList = serializer.data
         data = dict()
         for k, v in balance_for_account.items():
             res: list = []
-            s_data: ReturnDict = copy.deepcopy(x=serializer.data)
-            for s in s_data:
-                d: dict = v.get(s['address'])
+            for s in rows:
+                d: dict | None = v.get(s['address'])
                 if not d:
                     continue
-                s['value'] = d.get('value', 0)
-                s['tokens'] = d.get('tokens', [])
-                s['chain'] = d.get('chain')
-                res.append(s)
+                d = balance_filter.apply(data=d)
+                row: dict = dict(s, value=d.get('value', 0), tokens=d.get('tokens', []), chain=d.get('chain'), meta=d.get('meta'))
+                if 'filtered' in d:
+                    row['filtered'] = d['filtered']
+                res.append(row)
             data[k] = res
         return ResponseUtil.success(data=data)
 
+    @staticmethod
+    async def summary(user_id: int, wallets: list[Wallet], chains: list[str]) -> dict[str, Any]:
+        # Cached apart from the per-chain token lists; the key changes whenever the wallet or chain set does.
+        addresses: list[str] = sorted(w.address for w in wallets if w.address)
+        digest: str = hashlib.md5(','.join(sorted(chains) + addresses).encode()).hexdigest()
+        cache_key: str = f'satoshi:balance_summary:{user_id}:{digest}'
+        data: dict[str, Any] | None = await cache.aget(key=cache_key)
+        if data is not None:
+            return data
+
+        wallet_handler: WalletHandler = WalletHandler()
+        balance_for_account: dict[str, dict[str, dict]] = await wallet_handler.multi_get_balances(address_list=addresses, chain_list=chains)
+        data = summarize(balances=balance_for_account)
+        names: dict[str, str] = {w.address: w.name for w in wallets}
+        for address, wallet_data in data['wallets'].items():
+            wallet_data['name'] = names.get(address)
+        await cache.aset(key=cache_key, value=data, timeout=settings.BALANCE_CACHE_FRESH_TTL)
+        return data
+
     def post(self, request: Request, *args, **kwargs) -> Response:
         data: dict[str, Any] = request.data
         data['platform'] = data.get('platform', constants.DEFAULT_PLATFORM)
@@ -121,23 +155,10 @@ class ImportPrivateKeyView(APIView):
         if platform not in constants.PLATFORM_LIST:
             return ResponseUtil.field_error(msg='Platform error.')
 
-        if platform == 'EVM':
-            if len(private_key) < 64 or len(private_key) > 66:
-                return ResponseUtil.field_error()
-            
-            private_key_hex: str = "0x" + private_key if not private_key.startswith("0x") else private_key
-            public_key: Any = keys.PrivateKey(bytes.fromhex(private_key_hex[2:])).public_key
-            data['public_key'] = str(object=public_key)
-            data['address'] = public_key.to_checksum_address()
-        elif platform == 'SOL':
-            if len(private_key) > 90 or len(private_key) < 85:
-                return ResponseUtil.field_error()
-            
-            private_key_bytes: bytes = base58.b58decode(private_key)
-            signing_key: SigningKey = SigningKey(seed=private_key_bytes[:32])
-            public_key_bytes: bytes = signing_key.verify_key.encode()
-            data['public_key'] = base58.b58encode(public_key_bytes).decode(encoding='utf-8')
-            data['address'] = data['public_key']
+        derived: tuple[str, str] | None = derive_keys(platform=platform, private_key=private_key)
+        if not derived:
+            return ResponseUtil.field_error()
+        data['public_key'], data['address'] = derived
 
         serializer: PrivateKeySerializer = PrivateKeySerializer(data=data)
         if serializer.is_valid():
@@ -147,6 +168,62 @@ class ImportPrivateKeyView(APIView):
             return ResponseUtil.field_error()
 
 
+class BulkImportPrivateKeyView(APIView):
+    permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
+
+    def post(self, request: Request) -> Response:
+        form: forms.BulkImportForms = forms.BulkImportForms(data=request.data)
+        if not form.is_valid():
+            return ResponseUtil.field_error(msg=list(form.errors.values())[0][0])
+        items: list[dict[str, Any]] = form.cleaned_data['wallets']
+        for item in items:
+            item['platform'] = item.get('platform') or constants.DEFAULT_PLATFORM
+
+        derived: list[tuple[str, str] | None] = derive_many(
+            items=[(item['platform'], item['private_key']) for item in items],
+            processes=settings.WALLET_IMPORT_PROCESSES,
+            threshold=settings.WALLET_IMPORT_PROCESS_THRESHOLD,
+        )
+        existing: set[tuple[str, str]] = set(Wallet.objects.filter(
+            user=request.user, public_key__in=[d[0] for d in derived if d],
+        ).values_list('platform', 'public_key'))
+
+        # bulk_create skips Wallet.save(), so its platform/name defaults are applied here.
+        results: list[dict[str, Any]] = []
+        wallets: list[Wallet] = []
+        for index, (item, pair) in enumerate(zip(items, derived)):
+            if not pair:
+                results.append(dict(index=index, status='invalid'))
+                continue
+            public_key, address = pair
+            if (item['platform'], public_key) in existing:
+                results.append(dict(index=index, status='exists', address=address))
+                continue
+            existing.add((item['platform'], public_key))
+            wallet: Wallet = Wallet(
+                name=item.get('name') or "Wallet " + address[-4:],
+                address=address,
+                public_key=public_key,
+                private_key=item['private_key'],
+                platform=item['platform'],
+                user=request.user,
+            )
+            wallets.append(wallet)
+            results.append(dict(index=index, status='created', address=address, id=wallet.id))
+        Wallet.objects.bulk_create(objs=wallets, ignore_conflicts=True)
+        # ignore_conflicts drops rows a concurrent import inserted first; ids are generated here, so the survivors are found by id.
+        inserted: set[uuid.UUID] = set(Wallet.objects.filter(pk__in=[w.id for w in wallets]).values_list('id', flat=True))
+        for result in results:
+            if result['status'] == 'created' and result['id'] not in inserted:
+                result['status'] = 'exists'
+                del result['id']
+        return ResponseUtil.success(data=dict(
+            created=len(inserted),
+            skipped=len(items) - len(inserted),
+            results=results,
+        ))
+
+
 class ExportPrivateKeyView(APIView):
     permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
 
@@ -206,22 +283,57 @@ class DeleteWalletView(APIView):
         return ResponseUtil.success()
 
 
-class WalletBalanceAPIView(APIView):
+class WalletBalanceAPIView(AsyncAPIView):
     permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
 
-    def get(self, request: Request, address: str) -> Response:
+    async def get(self, request: Request, address: str) -> Response:
         chains: str | None = request.query_params.get('chain')
-        all_chains: dict[str, dict[str, str]] = copy.deepcopy(constants.CHAIN_DICT)
         if not chains:
-            chains: list[str] = all_chains.keys()
+            chains: list[str] = list(constants.CHAIN_DICT.keys())
         else:
             chains: list[str] = [c.strip() for c in chains.split(',') if c]
             for c in chains:
-                if c not in all_chains:
+                if c not in constants.CHAIN_DICT:
                     return ResponseUtil.field_error(msg=f'Chain error.')
+        form: forms.BalanceFilterForms = forms.BalanceFilterForms(data=request.query_params)
+        if not form.is_valid():
+            return ResponseUtil.field_error(msg=list(form.errors.values())[0][0])
+        balance_filter: BalanceFilter = BalanceFilter(**form.cleaned_data)
         wallet_handler: WalletHandler = WalletHandler()
-        balance_for_account: dict[str, Any] = asyncio.run(main=wallet_handler.multi_get_balances(address_list=[address], chain_list=chains))
-        return ResponseUtil.success(data={k:v[address] if len(v) else v for k, v in balance_for_account.items()})
+        balance_for_account: dict[str, Any] = await wallet_handler.multi_get_balances(address_list=[address], chain_list=chains)
+        return ResponseUtil.success(data={k:balance_filter.apply(data=v[address]) if len(v) else v for k, v in balance_for_account.items()})
+
+
+class WalletStreamAPIView(AsyncAPIView):
+    permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
+
+    async def get(self, request: Request) -> Response | StreamingHttpResponse:
+        chains: str | None = request.query_params.get('chain')
+        if not chains:
+            chains: list[str] = list(constants.CHAIN_DICT.keys())
+        else:
+            chains: list[str] = [c.strip() for c in chains.split(sep=',') if c]
+            for c in chains:
+                if c not in constants.CHAIN_DICT:
+                    return ResponseUtil.field_error(msg=f'Chain {c} error.')
+        wallets: list[Wallet] = [w async for w in Wallet.objects.filter(user=request.user)]
+        rows: dict[str, dict] = {s['address']: s for s in WalletListSerializer(wallets, many=True).data}
+        return BalanceStream.response(request=request, address_list=list(rows.keys()), chain_list=chains, rows=rows)
+
+
+class WalletBalanceStreamAPIView(AsyncAPIView):
+    permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
+
+    async def get(self, request: Request, address: str) -> Response | StreamingHttpResponse:
+        chains: str | None = request.query_params.get('chain')
+        if not chains:
+            chains: list[str] = list(constants.CHAIN_DICT.keys())
+        else:
+            chains: list[str] = [c.strip() for c in chains.split(',') if c]
+            for c in chains:
+                if c not in constants.CHAIN_DICT:
+                    return ResponseUtil.field_error(msg='Chain error.')
+        return BalanceStream.response(request=request, address_list=[address], chain_list=chains)
 
 
 class UserSelectView(APIView):
@@ -257,8 +369,8 @@ class UserSelectView(APIView):
         return ResponseUtil.success(data={"ids": existed_ids})
     
 
-class AccountTypeView(APIView):
-    def get(self, request: Request) -> Response:
+class AccountTypeView(AsyncAPIView):
+    async def get(self, request: Request) -> Response:
         chain: str = request.query_params.get('chain', default=constants.DEFAULT_CHAIN)
         if chain not in constants.CHAIN_DICT:
             return ResponseUtil.field_error(msg='Chain error.')
@@ -268,12 +380,15 @@ class AccountTypeView(APIView):
             params: dict[str, Any] = request.GET.dict()
             headers: dict[str, Any] = dict(request.headers)
 
-            response: requests.Response = requests.get(url=target_url, params=params, headers=headers)
+            async with HttpPool.session().get(url=target_url, params=params, headers=headers) as response:
+                data: dict[str, Any] = await response.json(content_type=None)
 
-            return ResponseUtil.success(data=json.loads(s=response.content).get('data', {}))
+            return ResponseUtil.success(data=data.get('data', {}))
         else:
             address: str = request.query_params.get('address', default='')
-            account_type: Literal['token'] | Literal['unknown'] | Literal['user'] = WalletHandler().account_type(address=address, chain=chain)
+            if not re.match(pattern=r'^0x[a-fA-F0-9]{40}$', string=address):
+                return ResponseUtil.field_error(msg='Address error.')
+            account_type: Literal['token'] | Literal['unknown'] | Literal['user'] = await WalletHandler.account_type(address=address, chain=chain)
             return ResponseUtil.success(data={"type": account_type})
     
 
@@ -289,9 +404,10 @@ class HashStatusAPIView(APIView):
         obj: WalletLog = get_object_or_404(klass=WalletLog, chain=chain, hash_tx=hash_tx, user = request.user)
         hash_status: int | None = obj.status
         created_at: datetime = obj.added_at
-        if hash_status in [0, 2]:
+        # Pending rows are kept current by the reconciler; only a timed-out one is checked again here.
+        if hash_status == WalletLog.STATUS_TIMEOUT:
             wallet_handler: WalletHandler = WalletHandler()
-            check_res: list | None = wallet_handler.check_hash(chain=chain, data_list=[dict(trxHash=hash_tx, trxTimestamp=int(obj.added_at.timestamp()))])
+            check_res: list | None = wallet_handler.check_hash(chain=chain, data_list=[dict(trxHash=hash_tx, trxTimestamp=sent_at(obj=obj))])
             if check_res:
                 check_res = check_res[0]
                 if check_res.get('isPending') == False and check_res.get('isSuccess') == True: # succeed
@@ -301,13 +417,116 @@ class HashStatusAPIView(APIView):
         if obj.status != hash_status:
             obj.status = hash_status
             obj.save()
+            publish_status(logs=[obj], status=hash_status)
         return ResponseUtil.success(data=dict(status=hash_status, created_at=created_at))
-    
+
+
+class HashStatusWaitAPIView(AsyncAPIView):
+    """Long-poll for /hash/status/: returns as soon as the status differs from `status`, or after `timeout` seconds."""
+    permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
+
+    async def get(self, request: Request) -> Response:
+        chain: str = request.query_params.get('chain', default=constants.DEFAULT_CHAIN)
+        if chain not in constants.CHAIN_DICT:
+            return ResponseUtil.field_error(msg='Chain error.')
+        hash_tx: str | None = request.query_params.get('hash_tx')
+        # Queued jobs have no hash yet; an empty filter would match them.
+        if not hash_tx:
+            return ResponseUtil.field_error(msg='Hash error.')
+        try:
+            known: int = int(request.query_params.get('status', WalletLog.STATUS_PENDING))
+            timeout: float = min(float(request.query_params.get('timeout', settings.HASH_STATUS_WAIT_TIMEOUT)), settings.HASH_STATUS_WAIT_TIMEOUT)
+        except ValueError:
+            return ResponseUtil.field_error()
+
+        # Listen before reading so a change between the read and the wait is not missed; one shared subscription per process.
+        subscriber: RedisSubscriber = RedisSubscriber.for_pattern(pattern=status_events.channel(user_id='*'))
+        async with subscriber.listen(channel=status_events.channel(user_id=request.user.id), timeout=timeout) as queue:
+            obj: WalletLog | None = await WalletLog.objects.filter(chain=chain, hash_tx=hash_tx, user=request.user).afirst()
+            if obj is None:
+                return ResponseUtil.no_data()
+            hash_status: int | None = obj.status
+            deadline: float = time.monotonic() + timeout
+            while hash_status == known and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    message: str = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except TimeoutError:
+                    break
+                event: dict[str, Any] = json.loads(s=message)
+                if event.get('id') == str(obj.id):
+                    hash_status = event['status']
+        return ResponseUtil.success(data=dict(status=hash_status, created_at=obj.added_at, changed=hash_status != known))
+
+
+class HashStatusBatchAPIView(APIView):
+    """Status of many (chain, hash_tx) pairs in one call.
+
+    Success/failed answers come from the cache, then the database; only
+    pending and timed-out rows are checked upstream, one grouped call per
+    chain, and the changes are written back with one UPDATE per status.
+    """
+    permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
+    final_status: tuple[int, ...] = (WalletLog.STATUS_SUCCESS, WalletLog.STATUS_FAILED)
+
+    @staticmethod
+    def cache_key(user_id: Any, chain: str, hash_tx: str) -> str:
+        return f'satoshi:hash_status:{user_id}:{chain}:{hash_tx}'
+
+    def post(self, request: Request) -> Response:
+        form: forms.HashStatusBatchForms = forms.HashStatusBatchForms(data=request.data)
+        if not form.is_valid():
+            return ResponseUtil.field_error(msg=list(form.errors.values())[0][0])
+        pairs: list[tuple[str, str]] = [(item.get('chain', constants.DEFAULT_CHAIN), item['hash_tx']) for item in form.cleaned_data['hashes']]
+        keys: dict[tuple[str, str], str] = {pair: self.cache_key(user_id=request.user.id, chain=pair[0], hash_tx=pair[1]) for pair in pairs}
+        cached: dict[str, dict] = cache.get_many(keys=list(keys.values()))
+        found: dict[tuple[str, str], dict[str, Any]] = {pair: cached[key] for pair, key in keys.items() if key in cached}
+
+        missing: set[tuple[str, str]] = set(keys) - set(found)
+        objs: list[WalletLog] = [obj for obj in WalletLog.objects.filter(
+            user=request.user, hash_tx__in={hash_tx for _, hash_tx in missing},
+        ).only('id', 'user_id', 'chain', 'hash_tx', 'status', 'added_at', 'submitted_at') if (obj.chain, obj.hash_tx) in missing]
+
+        unsettled: list[WalletLog] = [obj for obj in objs if obj.status in (WalletLog.STATUS_PENDING, WalletLog.STATUS_TIMEOUT)]
+        if unsettled:
+            reconciler: Reconciler = Reconciler()
+            transitions: dict[int, list[WalletLog]] = reconciler.check_page(page=unsettled)
+            reconciler.apply(transitions=transitions, totals={}, current=(WalletLog.STATUS_PENDING, WalletLog.STATUS_TIMEOUT))
+            for status, changed in transitions.items():
+                for obj in changed:
+                    obj.status = status
+
+        settled: dict[str, dict[str, Any]] = {}
+        for obj in objs:
+            data: dict[str, Any] = dict(status=obj.status, created_at=obj.added_at)
+            found[(obj.chain, obj.hash_tx)] = data
+            if obj.status in self.final_status:
+                settled[keys[(obj.chain, obj.hash_tx)]] = data
+        if settled:
+            cache.set_many(data=settled, timeout=settings.HASH_STATUS_CACHE_TTL)
+
+        results: list[dict[str, Any]] = []
+        for chain, hash_tx in pairs:
+            data = found.get((chain, hash_tx)) or dict(status=None, created_at=None)
+            results.append(dict(data, chain=chain, hash_tx=hash_tx))
+        return ResponseUtil.success(data=results)
+
+
+class JobStatusAPIView(APIView):
+    permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
+
+    def get(self, request: Request, pk: str) -> Response:
+        try:
+            uuid.UUID(hex=pk, version=4)
+        except ValueError:
+            return ResponseUtil.field_error()
+        log_obj: WalletLog = get_object_or_404(klass=WalletLog, pk=pk, user=request.user)
+        return ResponseUtil.success(data=submissions.job_data(log=log_obj))
+
 
 class WalletTransactionView(APIView):
     permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
 
-    @transaction.atomic
+    @idempotent
     def post(self, request: Request, pk: str) -> Response:
         try:
             uuid.UUID(hex=pk, version=4)
@@ -325,35 +544,25 @@ class WalletTransactionView(APIView):
         
         wallet: Wallet = get_object_or_404(klass=Wallet, pk=pk, user=request.user)
 
-        wallet_handler = WalletHandler()
-        transaction_hash: str | None = wallet_handler.token_transaction(
-            chain=chain, 
-            private_key=wallet.private_key, 
-            input_token=form_data['input_token'], 
-            output_token=form_data['output_token'], 
-            amount=form_data['amount'], 
-            slippageBps=form_data.get('slippageBps', 10) * 100,
-        )
-        if not transaction_hash:
-            return ResponseUtil.web3_error()
-        
-        log_obj: WalletLog = WalletLog.objects.create(
-            chain=chain,
-            input_token=form_data['input_token'],
-            output_token=form_data['output_token'],
-            amount=form_data['amount'],
-            hash_tx=transaction_hash,
+        submitted: tuple[WalletLog, dict] | Response = submissions.submit(
+            request=request,
             type_id=0,
-            status=0,
-            user=wallet.user,
+            wallet=wallet,
+            chain=chain,
+            params={k: form_data[k] for k in form_data},
+            log_fields=dict(chain=chain, input_token=form_data['input_token'], output_token=form_data['output_token'], amount=form_data['amount']),
         )
+        if isinstance(submitted, Response):
+            return submitted
+        log_obj, result = submitted
+        transaction_hash: str = result['hash_tx']
         return ResponseUtil.success(data=dict(hash_tx=transaction_hash, url=constants.CHAIN_DICT[chain]['tx_url'] + transaction_hash, status = log_obj.status))
     
 
 class CreateTokenView(APIView):
     permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
 
-    @transaction.atomic
+    @idempotent
     def post(self, request: Request, pk: str, *args, **kwargs) -> Response:
         try:
             uuid.UUID(hex=pk, version=4)
@@ -371,39 +580,27 @@ class CreateTokenView(APIView):
         
         wallet: Wallet = get_object_or_404(klass=Wallet, pk=pk, user=request.user)
 
-        wallet_handler: WalletHandler = WalletHandler()
-
         # create token
         amount: float = form_data.get('amount') or 0
-        created_hash, address = wallet_handler.create_token(
-            chain=chain, 
-            private_key=wallet.private_key, 
-            name=form_data['name'], 
-            symbol=form_data['symbol'], 
-            desc=form_data.get('desc', ''), 
-            decimals=str(object=form_data['decimals']), 
-            amount=str(object=amount),
-        )
-        if not created_hash:
-            return ResponseUtil.web3_error()
-        
-        log_obj: WalletLog = WalletLog.objects.create(
-            chain=chain,
-            input_token=address,
-            output_token=None,
-            amount=amount,
-            hash_tx=created_hash,
+        submitted: tuple[WalletLog, dict] | Response = submissions.submit(
+            request=request,
             type_id=1,
-            status=0,
-            user=wallet.user,
+            wallet=wallet,
+            chain=chain,
+            params={k: form_data[k] for k in form_data},
+            log_fields=dict(chain=chain, input_token=None, output_token=None, amount=amount),
         )
+        if isinstance(submitted, Response):
+            return submitted
+        log_obj, result = submitted
+        created_hash, address = result['hash_tx'], result['address']
         return ResponseUtil.success(data=dict(hash_tx=created_hash, url=constants.CHAIN_DICT[chain]['tx_url'] + created_hash, status = log_obj.status, address = address))
 
 
 class MintTokenView(APIView):
     permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
 
-    @transaction.atomic
+    @idempotent
     def post(self, request: Request, pk: str, *args, **kwargs) -> Response:
         try:
             uuid.UUID(hex=pk, version=4)
@@ -421,32 +618,21 @@ class MintTokenView(APIView):
             return ResponseUtil.field_error(msg='Chain error.')
 
         created_log: WalletLog = get_object_or_404(klass=WalletLog, chain=chain, hash_tx=created_hash, user = request.user)
-
-        wallet_handler: WalletHandler = WalletHandler()
-        check_res: list | None = wallet_handler.check_hash(chain=chain, data_list=[dict(trxHash=created_hash, trxTimestamp=int(x=created_log.added_at.timestamp()))])
-        if not (check_res and check_res[0].get('isPending') == False and check_res[0].get('isSuccess') == True): # succeed
-            return ResponseUtil.web3_error(msg='Hash status error.')
-        
         wallet: Wallet = get_object_or_404(klass=Wallet, pk=pk, user=request.user)
 
-        wallet_handler = WalletHandler()
-        address: None | str = wallet_handler.get_address_from_hash(chain=chain, hash_tx=created_hash)
-
         # mint token
-        mint_hash: str | None = wallet_handler.mint_token(chain=chain, private_key=wallet.private_key, create_hash=created_hash, mint_amount=str(object=form_data['amount']))
-        if not mint_hash:
-            return ResponseUtil.web3_error()
-        
-        log_obj: WalletLog = WalletLog.objects.create(
-            chain=chain,
-            input_token=None,
-            output_token=None,
-            amount=form_data['amount'],
-            hash_tx=mint_hash,
+        submitted: tuple[WalletLog, dict] | Response = submissions.submit(
+            request=request,
             type_id=2,
-            status=0,
-            user=wallet.user,
+            wallet=wallet,
+            chain=chain,
+            params=dict(created_hash=created_hash, created_at=int(x=created_log.added_at.timestamp()), amount=form_data['amount']),
+            log_fields=dict(chain=chain, input_token=None, output_token=None, amount=form_data['amount']),
         )
+        if isinstance(submitted, Response):
+            return submitted
+        log_obj, result = submitted
+        mint_hash, address = result['hash_tx'], result['address']
         return ResponseUtil.success(data=dict(hash_tx=mint_hash, url=constants.CHAIN_DICT[chain]['tx_url'] + mint_hash, address=address, status = log_obj.status))
 
 
@@ -475,7 +661,7 @@ class CoinCrossQuoteView(APIView):
 class CoinCrossView(APIView):
     permission_classes: list[type[IsAuthenticated]] = [IsAuthenticated]
 
-    @transaction.atomic
+    @idempotent
     def post(self, request: Request, pk: str, *args, **kwargs) -> Response:
         try:
             uuid.UUID(hex=pk, version=4)
@@ -492,26 +678,19 @@ class CoinCrossView(APIView):
             return ResponseUtil.field_error(msg='Chain error.')
         
         wallet: Wallet = get_object_or_404(klass=Wallet, pk=pk, user=request.user)
-        form_data['fromData']['walletSecretKey'] = wallet.private_key
-        form_data['fromData']['walletAddress'] = wallet.address
 
-        wallet_handler: WalletHandler = WalletHandler()
-        status_code, resp = wallet_handler.token_cross(form_data=form_data)
-        if status_code != 200 or resp.get('code') != 200:
-            return ResponseUtil.custom(status=status_code, code=resp.get('code'), data=resp.get('data'), msg = resp.get('message'))
-        
-        hash_tx: str = resp.get('data', {}).get('trx_hash')
-
-        WalletLog.objects.create(
-            chain=chain,
-            input_token=form_data['fromData']['tokenAddress'],
-            output_token=form_data['toData']['tokenAddress'],
-            amount=form_data['crossAmount'],
-            hash_tx=hash_tx,
+        submitted: tuple[WalletLog, dict] | Response = submissions.submit(
+            request=request,
             type_id=3,
-            status=0,
-            user=wallet.user,
+            wallet=wallet,
+            chain=chain,
+            params=form_data,
+            log_fields=dict(chain=chain, input_token=form_data['fromData']['tokenAddress'], output_token=form_data['toData']['tokenAddress'], amount=form_data['crossAmount']),
         )
+        if isinstance(submitted, Response):
+            return submitted
+        log_obj, result = submitted
+        hash_tx: str = result['hash_tx']
         return ResponseUtil.success(data=dict(hash_tx = hash_tx, url=constants.CHAIN_DICT[chain]['tx_url'] + hash_tx, provider = form_data.get('provider')))
     
 
@@ -0,0 +1,46 @@
+from typing import Any
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.utils.functional import classproperty
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """APIView dispatched on the server's event loop.
+
+    Authentication, permissions and throttling still run in a worker thread
+    because they may touch the ORM. `async def` handlers are awaited directly,
+    plain handlers keep working and are run through sync_to_async.
+    """
+
+    @classproperty
+    def view_is_async(cls) -> bool:
+        return True
+
+    async def dispatch(self, request: Any, *args, **kwargs) -> Response:
+        self.args: tuple = args
+        self.kwargs: dict = kwargs
+        request: Request = self.initialize_request(request, *args, **kwargs)
+        self.request: Request = request
+        self.headers: dict = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler: Any = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response: Response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response: Response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -7,7 +7,7 @@ PLATFORM_LIST: list[str] = [
     "SOL",
 ]
 
-CHAIN_DICT: dict[str, dict[str, str]] = {
+CHAIN_DICT: dict[str, dict[str, Any]] = {
     "ethereum": {
         "platform": "EVM",
         "id": "1",
@@ -16,7 +16,11 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "eth",
         "dex_tools": "ether",
         "ave": "eth",
-        "rpc": "https://ethereum-rpc.publicnode.com",
+        "rpc": [
+            "https://ethereum-rpc.publicnode.com",
+            "https://rpc.ankr.com/eth",
+            "https://1rpc.io/eth",
+        ],
         "tx_url": "https://etherscan.io/tx/",
         "token": {
             "symbol": "ETH",
@@ -34,7 +38,11 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "bsc",
         "dex_tools": "bsc",
         "ave": "bsc",
-        "rpc": "https://bsc-rpc.publicnode.com",
+        "rpc": [
+            "https://bsc-rpc.publicnode.com",
+            "https://bsc-dataseed.bnbchain.org",
+            "https://rpc.ankr.com/bsc",
+        ],
         "tx_url": "https://bscscan.com/tx/",
         "token": {
             "symbol": "BNB",
@@ -52,7 +60,10 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "solana",
         "dex_tools": "solana",
         "ave": "solana",
-        "rpc": "https://solana-rpc.publicnode.com",
+        "rpc": [
+            "https://solana-rpc.publicnode.com",
+            "https://api.mainnet-beta.solana.com",
+        ],
         "tx_url": "https://solscan.io/tx/",
         "token": {
             "symbol": "SOL",
@@ -70,7 +81,11 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "optimism",
         "dex_tools": "optimism",
         "ave": "optimism",
-        "rpc": "https://optimism-rpc.publicnode.com",
+        "rpc": [
+            "https://optimism-rpc.publicnode.com",
+            "https://mainnet.optimism.io",
+            "https://rpc.ankr.com/optimism",
+        ],
         "tx_url": "https://optimistic.etherscan.io/tx/",
         "token": {
             "symbol": "ETH",
@@ -88,7 +103,11 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "arbitrum",
         "dex_tools": "arbitrum",
         "ave": "arbitrum",
-        "rpc": "https://arbitrum-one-rpc.publicnode.com",
+        "rpc": [
+            "https://arbitrum-one-rpc.publicnode.com",
+            "https://arb1.arbitrum.io/rpc",
+            "https://rpc.ankr.com/arbitrum",
+        ],
         "tx_url": "https://arbiscan.io/tx/",
         "token": {
             "symbol": "ETH",
@@ -106,7 +125,11 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "base",
         "dex_tools": "base",
         "ave": "base",
-        "rpc": "https://base-rpc.publicnode.com",
+        "rpc": [
+            "https://base-rpc.publicnode.com",
+            "https://mainnet.base.org",
+            "https://rpc.ankr.com/base",
+        ],
         "tx_url": "https://basescan.org/tx/",
         "token": {
             "symbol": "ETH",
@@ -124,7 +147,11 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "ftm",
         "dex_tools": "fantom",
         "ave": "ftm",
-        "rpc": "https://fantom-rpc.publicnode.com",
+        "rpc": [
+            "https://fantom-rpc.publicnode.com",
+            "https://rpc.ftm.tools",
+            "https://rpc.ankr.com/fantom",
+        ],
         "tx_url": "https://ftmscan.com/tx/",
         "token": {
             "symbol": "FTM",
@@ -142,7 +169,10 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "zksync",
         "dex_tools": "zksync",
         "ave": "zksync",
-        "rpc": "https://1rpc.io/zksync2-era",
+        "rpc": [
+            "https://1rpc.io/zksync2-era",
+            "https://mainnet.era.zksync.io",
+        ],
         "tx_url": "https://explorer.zksync.io/tx/",
         "token": {
             "symbol": "ETH",
@@ -160,7 +190,10 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "linea",
         "dex_tools": "linea",
         "ave": "linea",
-        "rpc": "https://1rpc.io/linea",
+        "rpc": [
+            "https://1rpc.io/linea",
+            "https://rpc.linea.build",
+        ],
         "tx_url": "https://lineascan.build/tx/",
         "token": {
             "symbol": "ETH",
@@ -178,7 +211,7 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
     #     "gecko": "blast",
     #     "dex_tools": "blast",
     #     "ave": "blast",
-    #     "rpc": "https://rpc.ankr.com/blast",
+    #     "rpc": ["https://rpc.ankr.com/blast"],
     #     "tx_url": "https://blastexplorer.io/tx/",
     #     "token": {
     #         "symbol": "ETH",
@@ -196,7 +229,10 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "merlin-chain",
         "dex_tools": "",
         "ave": "merlin",
-        "rpc": "https://rpc.merlinchain.io",
+        "rpc": [
+            "https://rpc.merlinchain.io",
+            "https://merlin.blockpi.network/v1/rpc/public",
+        ],
         "tx_url": "https://scan.merlinchain.io/tx/",
         "token": {
             "symbol": "BTC",
@@ -214,7 +250,10 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "bevm",
         "dex_tools": "",
         "ave": "bevm",
-        "rpc": "https://rpc-mainnet-1.bevm.io",
+        "rpc": [
+            "https://rpc-mainnet-1.bevm.io",
+            "https://rpc-mainnet-2.bevm.io",
+        ],
         "tx_url": "https://scan-mainnet.bevm.io/tx/",
                 "token": {
             "symbol": "BTC",
@@ -232,7 +271,10 @@ CHAIN_DICT: dict[str, dict[str, str]] = {
         "gecko": "scroll",
         "dex_tools": "scroll",
         "ave": "scroll",
-        "rpc": "https://rpc.ankr.com/scroll",
+        "rpc": [
+            "https://rpc.ankr.com/scroll",
+            "https://rpc.scroll.io",
+        ],
         "tx_url": "https://scrollscan.com/tx/",
         "token": {
             "symbol": "ETH",
@@ -251,6 +293,8 @@ GECKO_CHAIN_DICT: dict[str, str] = {CHAIN_DICT[c]["gecko"]:c for c in CHAIN_DICT
 AVE_CHAIN_DICT: dict[str, str] = {CHAIN_DICT[c]["ave"]:c for c in CHAIN_DICT if CHAIN_DICT[c]["ave"]}
 
 DEFAULT_PLATFORM: str = "EVM"
+WALLET_IMPORT_MAX: int = 200
+HASH_STATUS_BATCH_MAX: int = 200
 DEFAULT_CHAIN: str = "bsc"
 
 ZERO_ADDRESS: str = "0x0000000000000000000000000000000000000000"
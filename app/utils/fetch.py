@@ -1,35 +1,79 @@
+from dataclasses import dataclass
 from typing import Any
-import requests
-from concurrent import futures
+import asyncio
+import time
+
+import aiohttp
+from django.conf import settings
+
+from utils.http_pool import HttpPool
+from utils.resilience import CircuitBreaker
 
 import logging
 
 logger: logging.Logger = logging.getLogger(name=__name__)
 
 
-class MultiFetch():
+@dataclass(slots=True)
+class FetchResult:
+    url: str
+    status: int | None = None
+    data: Any = None
+    error: str | None = None
+    elapsed: float = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Fetcher():
+    """Parallel GETs over the shared HttpPool session.
+
+    Connections are kept alive per vendor host by the pool's connector, every
+    call is bounded by `timeout` (FETCH_TIMEOUT by default) and goes through
+    the host circuit breaker. Failures come back as FetchResult.error
+    ('timeout', 'circuit_open', 'http_<status>' or the exception) instead of
+    being raised.
+    """
 
     @classmethod
-    def fetch_url(cls, headers: dict, url: str) -> str:
+    async def fetch(cls, url: str, headers: dict | None=None, timeout: float | None=None, session: aiohttp.ClientSession | None=None) -> FetchResult:
+        session = session or HttpPool.session()
+        breaker: CircuitBreaker = CircuitBreaker.for_host(target=url)
+        start: float = time.monotonic()
+        if not breaker.allow():
+            return FetchResult(url=url, error='circuit_open')
         try:
-            response: requests.Response = requests.get(url=url, headers=headers)
-            response.raise_for_status()
-            return response.json()
+            async with asyncio.timeout(delay=timeout or settings.FETCH_TIMEOUT):
+                async with session.get(url=url, headers=headers) as response:
+                    response.raise_for_status()
+                    data: Any = await response.json(content_type=None)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
         except Exception as e:
-            return dict(data=dict())
+            breaker.record(exc=e)
+            error: str = 'timeout' if isinstance(e, TimeoutError) else f'http_{e.status}' if isinstance(e, aiohttp.ClientResponseError) else str(object=e) or type(e).__name__
+            logger.warning(msg=f'Fetch error {url}: {error}')
+            return FetchResult(url=url, status=getattr(e, 'status', None), error=error, elapsed=time.monotonic() - start)
+        breaker.record(exc=None)
+        return FetchResult(url=url, status=response.status, data=data, elapsed=time.monotonic() - start)
 
     @classmethod
-    def fetch_multiple_urls(cls, headers: dict, urls: list[str]) -> dict:
-        with futures.ThreadPoolExecutor(max_workers=4) as executor:
-            future_to_url: dict[str, Any] = {executor.submit(cls.fetch_url, headers, url): url for url in urls}
-            results = dict()
-            for future in futures.as_completed(fs=future_to_url):
-                url: str = future_to_url[future]
-                try:
-                    data: Any = future.result()
-                    results[url] = data
-                except Exception as e:
-                    logger.error(msg=f"Error fetching URL '{url}': {str(object=e)}")
-        return results
+    async def fetch_many(cls, urls: list[str], headers: dict | None=None, timeout: float | None=None) -> dict[str, FetchResult]:
+        session: aiohttp.ClientSession = HttpPool.session()
+        results: list[FetchResult] = await asyncio.gather(*[cls.fetch(url=url, headers=headers, timeout=timeout, session=session) for url in urls])
+        return {result.url: result for result in results}
+
 
+class MultiFetch():
+    """Sync shim over Fetcher for the existing callers; a failed URL maps to {data: {}} as before.
 
+    Runs on HttpPool's background loop, so every call reuses one session.
+    """
+
+    @classmethod
+    def fetch_multiple_urls(cls, headers: dict, urls: list[str], timeout: float | None=None) -> dict:
+        results: dict[str, FetchResult] = HttpPool.run_sync(coro=Fetcher.fetch_many(urls=urls, headers=headers, timeout=timeout))
+        return {url: result.data if result.ok and isinstance(result.data, dict) else dict(data=dict()) for url, result in results.items()}
@@ -0,0 +1,82 @@
+from typing import Any, Coroutine
+import asyncio
+import os
+import threading
+import weakref
+
+import aiohttp
+from aiohttp import ClientTimeout, TCPConnector
+from django.conf import settings
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+class HttpPool():
+    """Process-wide aiohttp client shared by every async upstream call.
+
+    aiohttp sessions are bound to the event loop they were created on, so one
+    session is kept per running loop. Under daphne that is a single long-lived
+    session for the server loop. Sync code (celery, management commands,
+    sync views) goes through run_sync, which runs the coroutine on one
+    background loop per process, so it shares that loop's session instead of
+    opening a loop and a session per call.
+    """
+    _sessions: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession] = weakref.WeakKeyDictionary()
+    _background: tuple[int, asyncio.AbstractEventLoop] | None = None
+    _background_lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def session(cls) -> aiohttp.ClientSession:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        session: aiohttp.ClientSession | None = cls._sessions.get(loop)
+        if session is None or session.closed:
+            cls._prune()
+            connector = TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=settings.HTTP_POOL_DNS_TTL,
+                keepalive_timeout=settings.HTTP_POOL_KEEPALIVE,
+                enable_cleanup_closed=True,
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=ClientTimeout(total=settings.HTTP_POOL_TIMEOUT))
+            cls._sessions[loop] = session
+        return session
+
+    @classmethod
+    def background_loop(cls) -> asyncio.AbstractEventLoop:
+        # Keyed by pid: a forked celery worker inherits the loop object but not its thread.
+        background: tuple[int, asyncio.AbstractEventLoop] | None = cls._background
+        if background is None or background[0] != os.getpid():
+            with cls._background_lock:
+                background = cls._background
+                if background is None or background[0] != os.getpid():
+                    loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='http-pool', daemon=True).start()
+                    background = cls._background = (os.getpid(), loop)
+        return background[1]
+
+    @classmethod
+    def run_sync(cls, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Run `coro` on the background loop and wait for its result; for sync callers only."""
+        return asyncio.run_coroutine_threadsafe(coro=coro, loop=cls.background_loop()).result()
+
+    @classmethod
+    def _prune(cls) -> None:
+        for loop in [l for l in cls._sessions if l.is_closed()]:
+            session: aiohttp.ClientSession = cls._sessions.pop(loop)
+            # The owning loop is gone, so the connector can no longer be closed gracefully. Only loops
+            # created outside run_sync end up here.
+            session.detach()
+
+    @classmethod
+    async def close(cls) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        session: aiohttp.ClientSession | None = cls._sessions.pop(loop, None)
+        if session and not session.closed:
+            await session.close()
+            logger.info(msg='HTTP pool closed')
+        background: tuple[int, asyncio.AbstractEventLoop] | None = cls._background
+        if background and background[0] == os.getpid() and background[1] is not loop:
+            await asyncio.wrap_future(future=asyncio.run_coroutine_threadsafe(coro=cls.close(), loop=background[1]))
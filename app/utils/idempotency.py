@@ -0,0 +1,79 @@
+from typing import Any
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status as status_code
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from utils.response_util import ResponseUtil
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+KEY_PREFIX: str = 'satoshi:idempotency'
+
+
+def _fingerprint(request: Request) -> str:
+    body: str = json.dumps(obj=request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method}:{request.path}:{body}'.encode()).hexdigest()
+
+
+def _replay(entry: dict[str, Any]) -> Response:
+    response: Response = Response(status=entry['status'], data=entry['data'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(func: Any):
+    """Honour an `Idempotency-Key` header on a sync APIView handler.
+
+    The first request under a key marks it in flight and runs; its final
+    response (anything below 500) is kept for IDEMPOTENCY_TTL and replayed
+    to later requests with the same key and body. A retry arriving while the
+    first is still running gets 409 at once, so it never holds the sync
+    thread; the client retries later and gets the replay. Reusing a key for
+    a different request is rejected with 422.
+    Requests without the header run as before.
+    """
+    @functools.wraps(func)
+    def wrapped_f(self, request: Request, *args, **kwargs) -> Response:
+        key: str | None = request.headers.get('Idempotency-Key')
+        if not key:
+            return func(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return ResponseUtil.field_error(msg='Idempotency-Key too long.')
+
+        cache_key: str = f'{KEY_PREFIX}:{request.user.id}:{key}'
+        fingerprint: str = _fingerprint(request=request)
+        pending: dict[str, Any] = dict(state='pending', fingerprint=fingerprint)
+        if not cache.add(key=cache_key, value=pending, timeout=settings.IDEMPOTENCY_LOCK_TTL):
+            entry: dict[str, Any] | None = cache.get(key=cache_key)
+            # The marker vanished in between (first attempt failed or expired): claim it once, never loop.
+            if entry is None and not cache.add(key=cache_key, value=pending, timeout=settings.IDEMPOTENCY_LOCK_TTL):
+                entry = cache.get(key=cache_key) or pending
+            if entry is not None:
+                if entry['fingerprint'] != fingerprint:
+                    return ResponseUtil.custom(status=status_code.HTTP_422_UNPROCESSABLE_ENTITY, code=status_code.HTTP_422_UNPROCESSABLE_ENTITY, data=None, msg='Idempotency-Key was used for a different request.')
+                if entry['state'] == 'done':
+                    return _replay(entry=entry)
+                return ResponseUtil.custom(status=status_code.HTTP_409_CONFLICT, code=status_code.HTTP_409_CONFLICT, data=None, msg='Request with this Idempotency-Key is still in progress.')
+
+        try:
+            response: Response = func(self, request, *args, **kwargs)
+        except Exception:
+            cache.delete(key=cache_key)
+            raise
+        if response.status_code >= 500:
+            cache.delete(key=cache_key)
+        else:
+            try:
+                cache.set(key=cache_key, value=dict(state='done', fingerprint=fingerprint, status=response.status_code, data=response.data), timeout=settings.IDEMPOTENCY_TTL)
+            except Exception as e:
+                logger.warning(msg=f'Idempotency store error {key}: {e}')
+        return response
+    return wrapped_f
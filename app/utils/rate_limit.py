@@ -0,0 +1,74 @@
+import asyncio
+
+from django.conf import settings
+
+from utils.redis_pool import RedisPool
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class RateLimiter():
+    """Token bucket per upstream, shared by all workers through Redis.
+
+    Every call reserves the next free slot in one atomic script and sleeps
+    until that slot, so requests leave at the configured rate instead of in
+    bursts. Limits come from settings.UPSTREAM_RATE_LIMITS as (rate per second,
+    burst); names like `rpc:ethereum` fall back to the `rpc` entry but keep
+    their own bucket.
+    """
+    key_prefix: str = 'satoshi:rate'
+
+    # Tokens may go negative: the deficit is the queue of callers already
+    # waiting, and the reply is how long this caller has to wait (-1 = over max_wait).
+    script: str = """
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local max_wait = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or burst
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + (now - ts) * rate) - 1
+    local wait = 0
+    if tokens < 0 then
+        wait = -tokens / rate
+        if wait > max_wait then
+            return '-1'
+        end
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil((burst / rate + wait) * 1000) + 1000)
+    return tostring(wait)
+    """
+
+    @classmethod
+    def limits(cls, name: str) -> tuple[float, int] | None:
+        limits: dict[str, tuple[float, int]] = settings.UPSTREAM_RATE_LIMITS
+        return limits.get(name) or limits.get(name.split(sep=':')[0])
+
+    @classmethod
+    async def acquire(cls, name: str, max_wait: float | None = None) -> None:
+        limits: tuple[float, int] | None = cls.limits(name=name)
+        if not limits:
+            return
+        rate, burst = limits
+        if max_wait is None:
+            max_wait = settings.UPSTREAM_RATE_MAX_WAIT
+        try:
+            client = RedisPool.client()
+            wait: float = float(await client.register_script(script=cls.script)(keys=[f'{cls.key_prefix}:{name}'], args=[rate, burst, max_wait]))
+        except Exception as e:
+            # Fail open: a Redis outage must not take the balance endpoints down with it.
+            logger.warning(msg=f'Rate limiter error {name}: {e}')
+            return
+        if wait < 0:
+            raise RateLimitExceeded(f'{name} rate limit queue is full')
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,109 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import asyncio
+import os
+import weakref
+
+import redis.asyncio as aioredis
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+class RedisPool():
+    """Process-wide asyncio Redis client, one per running event loop (see HttpPool)."""
+    _clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def client(cls) -> aioredis.Redis:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        client: aioredis.Redis | None = cls._clients.get(loop)
+        if client is None:
+            client = aioredis.from_url(
+                url=os.getenv(key='REDIS_URL'),
+                decode_responses=True,
+                max_connections=int(os.getenv(key='REDIS_POOL_MAX_CONNECTIONS', default=100)),
+            )
+            cls._clients[loop] = client
+        return client
+
+    @classmethod
+    async def close(cls) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        client: aioredis.Redis | None = cls._clients.pop(loop, None)
+        if client:
+            await client.aclose()
+            logger.info(msg='Redis pool closed')
+
+
+class RedisSubscriber():
+    """One pub/sub connection per event loop and pattern, shared by every in-process listener.
+
+    The connection is its own, outside RedisPool, so long-lived listeners
+    never hold pooled connections. Messages are fanned out to the queues
+    registered for their channel; the connection is re-established after
+    errors, and listen() waits for it before handing out the queue.
+    """
+    reconnect_delay: float = 1
+    _subscribers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, 'RedisSubscriber']] = weakref.WeakKeyDictionary()
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern: str = pattern
+        self.queues: dict[str, set[asyncio.Queue]] = {}
+        self.ready: asyncio.Event = asyncio.Event()
+        self.task: asyncio.Task = asyncio.create_task(self._run())
+
+    @classmethod
+    def for_pattern(cls, pattern: str) -> 'RedisSubscriber':
+        subscribers: dict[str, RedisSubscriber] = cls._subscribers.setdefault(asyncio.get_running_loop(), {})
+        subscriber: RedisSubscriber | None = subscribers.get(pattern)
+        if subscriber is None:
+            subscriber = subscribers[pattern] = cls(pattern=pattern)
+        return subscriber
+
+    @asynccontextmanager
+    async def listen(self, channel: str, timeout: float) -> AsyncIterator[asyncio.Queue]:
+        """A queue of the `channel` messages published while the context is open."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self.queues.setdefault(channel, set()).add(queue)
+        try:
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout=timeout)
+            except TimeoutError:
+                logger.warning(msg=f'Redis subscriber {self.pattern} not ready')
+            yield queue
+        finally:
+            queues: set[asyncio.Queue] = self.queues.get(channel, set())
+            queues.discard(queue)
+            if not queues:
+                self.queues.pop(channel, None)
+
+    async def _run(self) -> None:
+        while True:
+            client: aioredis.Redis = aioredis.from_url(url=os.getenv(key='REDIS_URL'), decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(self.pattern)
+                self.ready.set()
+                async for message in pubsub.listen():
+                    if message['type'] != 'pmessage':
+                        continue
+                    for queue in self.queues.get(message['channel'], ()):
+                        queue.put_nowait(message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(msg=f'Redis subscriber {self.pattern} error: {e}')
+            finally:
+                self.ready.clear()
+                await pubsub.aclose()
+                await client.aclose()
+            await asyncio.sleep(self.reconnect_delay)
+
+    @classmethod
+    async def close(cls) -> None:
+        subscribers: dict[str, RedisSubscriber] = cls._subscribers.pop(asyncio.get_running_loop(), {})
+        for subscriber in subscribers.values():
+            subscriber.task.cancel()
+        await asyncio.gather(*[s.task for s in subscribers.values()], return_exceptions=True)
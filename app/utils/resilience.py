@@ -0,0 +1,203 @@
+from typing import Any, Callable
+from urllib.parse import urlparse
+import asyncio
+import functools
+import random
+import threading
+import time
+
+import aiohttp
+import requests
+from django.conf import settings
+from prometheus_client import Counter, Gauge
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+RETRYABLE_STATUS: frozenset[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+CIRCUIT_STATE: Gauge = Gauge('upstream_circuit_state', 'Circuit breaker state per upstream host (0=closed, 1=open, 2=half-open).', ['host'])
+UPSTREAM_FAILURES: Counter = Counter('upstream_failures_total', 'Retryable upstream failures per host.', ['host'])
+CIRCUIT_REJECTED: Counter = Counter('upstream_circuit_rejected_total', 'Calls rejected because the host circuit was open.', ['host'])
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, host: str) -> None:
+        super().__init__(f'Circuit open for {host}')
+        self.host: str = host
+
+
+class CircuitBreaker():
+    """Per-host circuit breaker shared by the async and sync upstream clients.
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive retryable failures the host is
+    opened and calls fail fast for CIRCUIT_RECOVERY_TIMEOUT seconds. Then a
+    single probe call is let through (half-open); its outcome closes or
+    re-opens the circuit.
+    """
+    CLOSED: int = 0
+    OPEN: int = 1
+    HALF_OPEN: int = 2
+
+    _breakers: dict[str, 'CircuitBreaker'] = {}
+    _registry_lock: threading.Lock = threading.Lock()
+
+    def __init__(self, host: str) -> None:
+        self.host: str = host
+        self.state: int = self.CLOSED
+        self.failures: int = 0
+        self.opened_at: float = 0
+        self._probing: bool = False
+        self._lock: threading.Lock = threading.Lock()
+        CIRCUIT_STATE.labels(host=host).set(self.CLOSED)
+
+    @classmethod
+    def for_host(cls, target: str) -> 'CircuitBreaker':
+        host: str = urlparse(url=target).netloc or target
+        breaker: CircuitBreaker | None = cls._breakers.get(host)
+        if breaker is None:
+            with cls._registry_lock:
+                breaker = cls._breakers.setdefault(host, cls(host=host))
+        return breaker
+
+    def _set_state(self, state: int) -> None:
+        if self.state != state:
+            logger.warning(msg=f'Circuit {self.host}: {self.state} -> {state}')
+        self.state = state
+        CIRCUIT_STATE.labels(host=self.host).set(state)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < settings.CIRCUIT_RECOVERY_TIMEOUT:
+                    CIRCUIT_REJECTED.labels(host=self.host).inc()
+                    return False
+                self._set_state(state=self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    CIRCUIT_REJECTED.labels(host=self.host).inc()
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._set_state(state=self.CLOSED)
+
+    def record_failure(self) -> None:
+        UPSTREAM_FAILURES.labels(host=self.host).inc()
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+                self.opened_at = time.monotonic()
+                self._set_state(state=self.OPEN)
+
+    def release(self) -> None:
+        # The call was abandoned (e.g. a losing hedge); free the half-open probe slot without a verdict.
+        with self._lock:
+            self._probing = False
+
+    def record(self, exc: BaseException | None) -> None:
+        # Only retryable errors count against the host; a 4xx still proves it is up.
+        if exc is not None and is_retryable(exc=exc):
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status: int | None = getattr(exc, 'status', None)
+    if status is None and isinstance(exc, requests.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError, requests.ConnectionError, requests.Timeout))
+
+
+def backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    # Full jitter: uniform over [0, base * 2^(attempt-1)], capped.
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+def retry(retries: int=3, base_delay: float=0.25, max_delay: float=4.0, host: str | Callable[..., str | None] | None=None):
+    """Retry retryable upstream errors with jittered exponential backoff.
+
+    Works on both coroutine and plain functions. `host` (a URL/host, or a
+    callable receiving the wrapped function's arguments) selects the
+    circuit breaker; while it is open the call raises CircuitOpenError
+    without touching the network. The last error is re-raised.
+    """
+    def wrapper(func: Any):
+        def get_breaker(args: tuple, kwargs: dict) -> CircuitBreaker | None:
+            target: str | None = host(*args, **kwargs) if callable(host) else host
+            return CircuitBreaker.for_host(target=target) if target else None
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapped_f(*args, **kwargs) -> Any:
+                breaker: CircuitBreaker | None = get_breaker(args=args, kwargs=kwargs)
+                for attempt in range(1, retries + 1):
+                    if breaker and not breaker.allow():
+                        raise CircuitOpenError(host=breaker.host)
+                    try:
+                        result: Any = await func(*args, **kwargs)
+                    except asyncio.CancelledError:
+                        # No verdict on a cancelled call, but a half-open probe must give its slot back.
+                        if breaker:
+                            breaker.release()
+                        raise
+                    except Exception as e:
+                        if breaker:
+                            breaker.record(exc=e)
+                        if attempt == retries or not is_retryable(exc=e):
+                            raise
+                        await asyncio.sleep(backoff(attempt=attempt, base_delay=base_delay, max_delay=max_delay))
+                    else:
+                        if breaker:
+                            breaker.record(exc=None)
+                        return result
+            return async_wrapped_f
+
+        @functools.wraps(func)
+        def wrapped_f(*args, **kwargs) -> Any:
+            breaker: CircuitBreaker | None = get_breaker(args=args, kwargs=kwargs)
+            for attempt in range(1, retries + 1):
+                if breaker and not breaker.allow():
+                    raise CircuitOpenError(host=breaker.host)
+                try:
+                    result: Any = func(*args, **kwargs)
+                except Exception as e:
+                    if breaker:
+                        breaker.record(exc=e)
+                    if attempt == retries or not is_retryable(exc=e):
+                        raise
+                    time.sleep(backoff(attempt=attempt, base_delay=base_delay, max_delay=max_delay))
+                except BaseException:
+                    # Interrupted (KeyboardInterrupt, SystemExit): release a half-open probe slot.
+                    if breaker:
+                        breaker.release()
+                    raise
+                else:
+                    if breaker:
+                        breaker.record(exc=None)
+                    return result
+        return wrapped_f
+    return wrapper
+
+
+@retry(retries=3, host=lambda method, url, **kwargs: url)
+def http_request(method: str, url: str, **kwargs) -> requests.Response:
+    """requests.request with a default timeout, retries and the host circuit breaker.
+
+    Retryable statuses are raised so they count as failures; any other
+    response is returned for the caller to inspect as before.
+    """
+    kwargs.setdefault('timeout', 15)
+    response: requests.Response = requests.request(method=method, url=url, **kwargs)
+    if response.status_code in RETRYABLE_STATUS:
+        response.raise_for_status()
+    return response
@@ -0,0 +1,139 @@
+from collections import deque
+from typing import Any
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import ClientTimeout
+from django.conf import settings
+from prometheus_client import Counter, Gauge
+
+from utils import constants
+from utils.rate_limit import RateLimiter
+from utils.resilience import CircuitBreaker, CircuitOpenError
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+RPC_LATENCY: Gauge = Gauge('rpc_endpoint_latency_seconds', 'EWMA latency per JSON-RPC endpoint.', ['chain', 'url'])
+RPC_ERROR_RATE: Gauge = Gauge('rpc_endpoint_error_rate', 'EWMA error rate per JSON-RPC endpoint.', ['chain', 'url'])
+RPC_HEDGED: Counter = Counter('rpc_hedged_requests_total', 'Hedged second requests sent per chain.', ['chain'])
+
+
+class RpcEndpoint():
+    # Latency assumed for an endpoint that has not answered yet; a primary slower than this lets the next one be tried.
+    initial_latency: float = 0.5
+    error_penalty: float = 10
+
+    def __init__(self, chain: str, url: str, index: int) -> None:
+        self.chain: str = chain
+        self.url: str = url
+        self.index: int = index
+        self.latency: float = self.initial_latency
+        self.error_rate: float = 0
+        self.samples: deque[float] = deque(maxlen=100)
+        self.breaker: CircuitBreaker = CircuitBreaker.for_host(target=url)
+
+    @property
+    def score(self) -> float:
+        return self.latency * (1 + self.error_penalty * self.error_rate)
+
+    def p95(self) -> float | None:
+        if len(self.samples) < 20:
+            return None
+        return sorted(self.samples)[int(len(self.samples) * 0.95) - 1]
+
+    def observe(self, latency: float, error: bool) -> None:
+        alpha: float = settings.RPC_POOL_EWMA_ALPHA
+        self.latency += alpha * (latency - self.latency)
+        self.error_rate += alpha * ((1 if error else 0) - self.error_rate)
+        if not error:
+            self.samples.append(latency)
+        RPC_LATENCY.labels(chain=self.chain, url=self.url).set(self.latency)
+        RPC_ERROR_RATE.labels(chain=self.chain, url=self.url).set(self.error_rate)
+
+
+class RpcPool():
+    """JSON-RPC endpoints per chain (CHAIN_DICT[chain]['rpc']), best first.
+
+    Endpoints are ranked by EWMA latency inflated by their EWMA error rate.
+    A request goes to the best endpoint whose circuit is closed and fails
+    over down the list on errors. With RPC_POOL_HEDGE on, a second endpoint
+    is also tried once the first has taken longer than its p95 latency; the
+    first answer wins and the other call is cancelled.
+    """
+    _pools: dict[str, list[RpcEndpoint]] = {}
+
+    @classmethod
+    def endpoints(cls, chain: str) -> list[RpcEndpoint]:
+        pool: list[RpcEndpoint] | None = cls._pools.get(chain)
+        if pool is None:
+            urls: list[str] | str = constants.CHAIN_DICT[chain]['rpc']
+            if isinstance(urls, str):
+                urls = [urls]
+            pool = cls._pools.setdefault(chain, [RpcEndpoint(chain=chain, url=u, index=i) for i, u in enumerate(urls)])
+        return pool
+
+    @classmethod
+    def ranked(cls, chain: str) -> list[RpcEndpoint]:
+        return sorted(cls.endpoints(chain=chain), key=lambda e: (e.score, e.index))
+
+    @classmethod
+    async def request(cls, chain: str, payload: list[dict] | dict, session: aiohttp.ClientSession) -> Any:
+        await RateLimiter.acquire(name=f'rpc:{chain}')
+        candidates = iter(cls.ranked(chain=chain))
+        pending: dict[asyncio.Task, RpcEndpoint] = {}
+        last_error: BaseException | None = None
+
+        def launch() -> RpcEndpoint | None:
+            for endpoint in candidates:
+                if endpoint.breaker.allow():
+                    pending[asyncio.create_task(cls._send(endpoint=endpoint, payload=payload, session=session))] = endpoint
+                    return endpoint
+            return None
+
+        first: RpcEndpoint | None = launch()
+        hedge_delay: float | None = None
+        if first and settings.RPC_POOL_HEDGE:
+            p95: float | None = first.p95()
+            if p95 is not None:
+                hedge_delay = max(p95, settings.RPC_POOL_HEDGE_MIN_DELAY)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_delay = None
+                    if launch():
+                        RPC_HEDGED.labels(chain=chain).inc()
+                    continue
+                for task in done:
+                    endpoint: RpcEndpoint = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(msg=f'RPC error {chain} {endpoint.url}: {last_error}')
+                if not pending:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error or CircuitOpenError(host=chain)
+
+    @staticmethod
+    async def _send(endpoint: RpcEndpoint, payload: list[dict] | dict, session: aiohttp.ClientSession) -> Any:
+        start: float = time.monotonic()
+        try:
+            async with session.post(url=endpoint.url, json=payload, timeout=ClientTimeout(total=settings.RPC_POOL_TIMEOUT)) as response:
+                response.raise_for_status()
+                data: Any = await response.json(content_type=None)
+        except asyncio.CancelledError:
+            endpoint.breaker.release()
+            raise
+        except Exception as e:
+            endpoint.observe(latency=time.monotonic() - start, error=True)
+            endpoint.breaker.record(exc=e)
+            raise
+        endpoint.observe(latency=time.monotonic() - start, error=False)
+        endpoint.breaker.record(exc=None)
+        return data
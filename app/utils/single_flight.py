@@ -0,0 +1,166 @@
+from typing import Any, Callable
+import asyncio
+import functools
+import json
+import threading
+import time
+import weakref
+
+from django.core.cache import cache
+
+from utils.redis_pool import RedisPool
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+class _Call():
+    def __init__(self) -> None:
+        self.event: threading.Event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight():
+    """Collapses identical concurrent upstream requests into one.
+
+    Inside a process, callers with the same key share the leader's in-flight
+    call (an asyncio task, or a threading.Event for sync code). Across
+    workers a short Redis lock elects one leader; the others poll for the
+    result it publishes and only call the upstream themselves if the lock
+    disappears without a result (leader failed) or the wait exceeds `ttl`.
+    """
+    key_prefix: str = 'satoshi:sf'
+    poll_interval: float = 0.05
+    result_ttl: float = 5
+
+    _tasks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task]] = weakref.WeakKeyDictionary()
+    _calls: dict[str, _Call] = {}
+    _calls_lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    async def run(cls, key: str, func: Callable, *args, ttl: float = 10, **kwargs) -> Any:
+        tasks: dict[str, asyncio.Task] = cls._tasks.setdefault(asyncio.get_running_loop(), {})
+        task: asyncio.Task | None = tasks.get(key)
+        if task is None:
+            # The leader runs as its own task so a cancelled caller does not cancel the followers.
+            task = asyncio.create_task(cls._lead(key=key, func=func, args=args, kwargs=kwargs, ttl=ttl))
+            tasks[key] = task
+            task.add_done_callback(lambda t: tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _lead(cls, key: str, func: Callable, args: tuple, kwargs: dict, ttl: float) -> Any:
+        lock_key, result_key = f'{cls.key_prefix}:lock:{key}', f'{cls.key_prefix}:result:{key}'
+        try:
+            redis = RedisPool.client()
+            acquired: bool = bool(await redis.set(name=lock_key, value=1, nx=True, px=int(ttl * 1000)))
+        except Exception as e:
+            logger.warning(msg=f'Single flight lock error {key}: {e}')
+            return await func(*args, **kwargs)
+
+        if not acquired:
+            deadline: float = time.monotonic() + ttl
+            try:
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(cls.poll_interval)
+                    raw: str | None = await redis.get(name=result_key)
+                    if raw is not None:
+                        return json.loads(s=raw)
+                    if not await redis.exists(lock_key):
+                        break
+            except Exception as e:
+                logger.warning(msg=f'Single flight wait error {key}: {e}')
+            return await func(*args, **kwargs)
+
+        try:
+            result: Any = await func(*args, **kwargs)
+            try:
+                await redis.set(name=result_key, value=json.dumps(obj=result), px=int(cls.result_ttl * 1000))
+            except (TypeError, ValueError):
+                pass
+            return result
+        finally:
+            try:
+                await redis.delete(lock_key)
+            except Exception as e:
+                logger.warning(msg=f'Single flight unlock error {key}: {e}')
+
+    @classmethod
+    def run_sync(cls, key: str, func: Callable, *args, ttl: float = 10, **kwargs) -> Any:
+        with cls._calls_lock:
+            call: _Call | None = cls._calls.get(key)
+            leader: bool = call is None
+            if leader:
+                call = cls._calls[key] = _Call()
+
+        if not leader:
+            if call.event.wait(timeout=ttl):
+                if call.error:
+                    raise call.error
+                return call.result
+            return func(*args, **kwargs)
+
+        try:
+            call.result = cls._lead_sync(key=key, func=func, args=args, kwargs=kwargs, ttl=ttl)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with cls._calls_lock:
+                cls._calls.pop(key, None)
+            call.event.set()
+
+    @classmethod
+    def _lead_sync(cls, key: str, func: Callable, args: tuple, kwargs: dict, ttl: float) -> Any:
+        lock_key, result_key = f'{cls.key_prefix}:lock:{key}', f'{cls.key_prefix}:result:{key}'
+        try:
+            acquired: bool = cache.add(key=lock_key, value=1, timeout=ttl)
+        except Exception as e:
+            logger.warning(msg=f'Single flight lock error {key}: {e}')
+            return func(*args, **kwargs)
+
+        if not acquired:
+            deadline: float = time.monotonic() + ttl
+            try:
+                while time.monotonic() < deadline:
+                    time.sleep(cls.poll_interval)
+                    result: Any = cache.get(key=result_key, default=cache)
+                    if result is not cache:
+                        return result
+                    if cache.get(key=lock_key) is None:
+                        break
+            except Exception as e:
+                logger.warning(msg=f'Single flight wait error {key}: {e}')
+            return func(*args, **kwargs)
+
+        try:
+            result = func(*args, **kwargs)
+            try:
+                cache.set(key=result_key, value=result, timeout=cls.result_ttl)
+            except Exception as e:
+                logger.warning(msg=f'Single flight publish error {key}: {e}')
+            return result
+        finally:
+            try:
+                cache.delete(key=lock_key)
+            except Exception as e:
+                logger.warning(msg=f'Single flight unlock error {key}: {e}')
+
+
+def single_flight(key: Callable[..., str], ttl: float = 10):
+    """Decorator form of SingleFlight; `key` receives the wrapped function's arguments."""
+    def wrapper(func: Any):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapped_f(*args, **kwargs) -> Any:
+                return await SingleFlight.run(key(*args, **kwargs), func, *args, ttl=ttl, **kwargs)
+            return async_wrapped_f
+
+        @functools.wraps(func)
+        def wrapped_f(*args, **kwargs) -> Any:
+            return SingleFlight.run_sync(key(*args, **kwargs), func, *args, ttl=ttl, **kwargs)
+        return wrapped_f
+    return wrapper
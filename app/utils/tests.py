@@ -0,0 +1,105 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator
+from unittest import mock
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from django.test import SimpleTestCase, override_settings
+
+from utils import constants
+from utils.rate_limit import RateLimiter
+from utils.resilience import CircuitBreaker
+from utils.rpc_pool import RpcEndpoint, RpcPool
+
+
+CHAIN: str = 'rpc-test'
+PAYLOAD: dict[str, Any] = dict(jsonrpc='2.0', id=1, method='eth_blockNumber', params=[])
+SLOW_DELAY: float = 2
+# How each stub endpoint misbehaves.
+STUBS: dict[str, dict[str, Any]] = {
+    'dead': dict(status=503),
+    'slow': dict(delay=SLOW_DELAY),
+    'healthy': dict(),
+}
+
+
+def rpc_app(name: str, hits: list[str], delay: float=0, status: int=200) -> web.Application:
+    """A JSON-RPC endpoint answering every call with its own name."""
+    async def handle(request: web.Request) -> web.Response:
+        hits.append(name)
+        payload: dict[str, Any] = await request.json()
+        if delay:
+            await asyncio.sleep(delay)
+        if status != 200:
+            return web.Response(status=status)
+        return web.json_response(data=dict(jsonrpc='2.0', id=payload.get('id'), result=name))
+
+    app: web.Application = web.Application()
+    app.router.add_post(path='/', handler=handle)
+    return app
+
+
+@override_settings(
+    RPC_POOL_HEDGE=False,
+    RPC_POOL_HEDGE_MIN_DELAY=0.05,
+    RPC_POOL_TIMEOUT=5,
+    CIRCUIT_FAILURE_THRESHOLD=5,
+    CIRCUIT_RECOVERY_TIMEOUT=30,
+)
+class RpcPoolTests(SimpleTestCase):
+    """RpcPool against local JSON-RPC stubs: one dead (503), one slow, one healthy.
+
+    Every stub listens on its own port, so each has its own circuit breaker.
+    """
+
+    @asynccontextmanager
+    async def pool(self, *names: str) -> AsyncIterator[list[RpcEndpoint]]:
+        """Start the named stubs and make them CHAIN's endpoints, ranked in the given order."""
+        self.hits: list[str] = []
+        async with AsyncExitStack() as stack:
+            urls: list[str] = []
+            for name in names:
+                server: TestServer = TestServer(rpc_app(name=name, hits=self.hits, **STUBS[name]))
+                await server.start_server()
+                stack.push_async_callback(server.close)
+                urls.append(str(object=server.make_url(path='/')))
+            self.session: aiohttp.ClientSession = await stack.enter_async_context(aiohttp.ClientSession())
+            stack.enter_context(mock.patch.dict(constants.CHAIN_DICT, {CHAIN: dict(rpc=urls)}))
+            stack.enter_context(mock.patch.object(RpcPool, '_pools', {}))
+            stack.enter_context(mock.patch.object(CircuitBreaker, '_breakers', {}))
+            stack.enter_context(mock.patch.object(RateLimiter, 'acquire', mock.AsyncMock()))
+            yield RpcPool.endpoints(chain=CHAIN)
+
+    async def test_fails_over_to_healthy_endpoint(self) -> None:
+        async with self.pool('dead', 'healthy') as endpoints:
+            result: Any = await RpcPool.request(chain=CHAIN, payload=PAYLOAD, session=self.session)
+        self.assertEqual(result['result'], 'healthy')
+        self.assertEqual(self.hits, ['dead', 'healthy'])
+        self.assertGreater(endpoints[0].error_rate, 0)
+        self.assertEqual(endpoints[1].error_rate, 0)
+
+    async def test_skips_open_circuit(self) -> None:
+        async with self.pool('dead', 'healthy') as endpoints:
+            for _ in range(5):
+                endpoints[0].breaker.record_failure()
+            result: Any = await RpcPool.request(chain=CHAIN, payload=PAYLOAD, session=self.session)
+        self.assertEqual(endpoints[0].breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(result['result'], 'healthy')
+        self.assertEqual(self.hits, ['healthy'])
+
+    @override_settings(RPC_POOL_HEDGE=True)
+    async def test_hedges_after_p95_delay(self) -> None:
+        hedge_delay: float = 0.3
+        async with self.pool('slow', 'healthy') as endpoints:
+            # A p95 well below the stub's real latency, so the hedge has to fire.
+            endpoints[0].samples.extend([hedge_delay] * 20)
+            start: float = time.monotonic()
+            result: Any = await RpcPool.request(chain=CHAIN, payload=PAYLOAD, session=self.session)
+            elapsed: float = time.monotonic() - start
+        self.assertEqual(result['result'], 'healthy')
+        self.assertEqual(self.hits, ['slow', 'healthy'])
+        self.assertGreaterEqual(elapsed, hedge_delay)
+        self.assertLess(elapsed, SLOW_DELAY)
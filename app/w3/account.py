@@ -0,0 +1,181 @@
+from datetime import timedelta
+from typing import Any
+import asyncio
+
+import aiohttp
+from django.conf import settings
+from django.utils import timezone
+
+from users.models import AddressClassification
+from utils.redis_pool import RedisPool
+from utils.rpc_pool import RpcPool
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# ERC-20 selectors: totalSupply(), balanceOf(address), allowance(address,address)
+TOTAL_SUPPLY_SELECTOR: str = '0x18160ddd'
+BALANCE_OF_SELECTOR: str = '0x70a08231'
+ALLOWANCE_SELECTOR: str = '0xdd62ed3e'
+
+
+class AccountClassifier():
+    """EVM address classification per chain, cached in Redis with the DB behind it.
+
+    Types are `user` (no code), `contract` (has code, not probed further),
+    `token` and `unknown` (probed contract that is not an ERC-20). Contracts
+    keep for ACCOUNT_TYPE_CACHE_TTL; `user` expires after
+    ACCOUNT_TYPE_USER_CACHE_TTL since code can still be deployed to it.
+    Calls to one RPC endpoint go out as a single JSON-RPC batch.
+    """
+    key_prefix: str = 'satoshi:account_type'
+
+    USER: str = 'user'
+    CONTRACT: str = 'contract'
+    TOKEN: str = 'token'
+    UNKNOWN: str = 'unknown'
+
+    # Chains whose endpoint answered a batch with a single error object.
+    _no_batch: set[str] = set()
+
+    @classmethod
+    def _key(cls, chain: str, address: str) -> str:
+        return f'{cls.key_prefix}:{chain}:{address}'
+
+    @classmethod
+    def _ttl(cls, account_type: str) -> int:
+        return settings.ACCOUNT_TYPE_USER_CACHE_TTL if account_type == cls.USER else settings.ACCOUNT_TYPE_CACHE_TTL
+
+    @classmethod
+    async def lookup(cls, address: str, chain_list: list[str]) -> dict[str, str]:
+        address = address.lower()
+        found: dict[str, str] = {}
+        try:
+            values: list[str | None] = await RedisPool.client().mget([cls._key(chain=c, address=address) for c in chain_list])
+            found = {c: v for c, v in zip(chain_list, values) if v}
+        except Exception as e:
+            logger.warning(msg=f'Account type cache read error: {e}')
+
+        missing: list[str] = [c for c in chain_list if c not in found]
+        if not missing:
+            return found
+        user_cutoff = timezone.now() - timedelta(seconds=settings.ACCOUNT_TYPE_USER_CACHE_TTL)
+        try:
+            stored: dict[str, str] = {
+                r.chain: r.type async for r in AddressClassification.objects
+                .filter(address=address, chain__in=missing)
+                .exclude(type=cls.USER, updated_at__lt=user_cutoff)
+            }
+        except Exception as e:
+            logger.warning(msg=f'Account type db read error: {e}')
+            return found
+        if stored:
+            await cls._cache(address=address, types=stored)
+            found.update(stored)
+        return found
+
+    @classmethod
+    async def store(cls, address: str, types: dict[str, str]) -> None:
+        address = address.lower()
+        await cls._cache(address=address, types=types)
+        try:
+            await AddressClassification.objects.abulk_create(
+                objs=[AddressClassification(chain=c, address=address, type=t) for c, t in types.items()],
+                update_conflicts=True,
+                unique_fields=['chain', 'address'],
+                update_fields=['type', 'updated_at'],
+            )
+        except Exception as e:
+            logger.warning(msg=f'Account type db write error: {e}')
+
+    @classmethod
+    async def _cache(cls, address: str, types: dict[str, str]) -> None:
+        try:
+            async with RedisPool.client().pipeline(transaction=False) as pipe:
+                for chain, account_type in types.items():
+                    pipe.set(name=cls._key(chain=chain, address=address), value=account_type, ex=cls._ttl(account_type=account_type))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(msg=f'Account type cache write error: {e}')
+
+    @classmethod
+    async def rpc_batch(cls, chain: str, calls: list[tuple[str, list]], session: aiohttp.ClientSession) -> list[Any]:
+        """Run JSON-RPC calls against the chain's RPC pool in one HTTP request.
+
+        Results come back in call order, None for calls that errored. Endpoints
+        that refuse batches get the calls one by one, concurrently.
+        """
+        payload: list[dict[str, Any]] = [dict(jsonrpc='2.0', id=i, method=method, params=params) for i, (method, params) in enumerate(calls)]
+        if len(payload) == 1 or chain in cls._no_batch:
+            data: list[Any] = await asyncio.gather(*[RpcPool.request(chain=chain, payload=p, session=session) for p in payload])
+        else:
+            data = await RpcPool.request(chain=chain, payload=payload, session=session)
+            if isinstance(data, dict):
+                logger.warning(msg=f'RPC batch refused on {chain}: {data.get("error")}')
+                cls._no_batch.add(chain)
+                data = await asyncio.gather(*[RpcPool.request(chain=chain, payload=p, session=session) for p in payload])
+
+        results: list[Any] = [None] * len(calls)
+        for item in data:
+            if isinstance(item, dict) and isinstance(item.get('id'), int) and 0 <= item['id'] < len(calls):
+                results[item['id']] = item.get('result')
+        return results
+
+    @classmethod
+    async def classify_code(cls, address: str, chain_list: list[str], session: aiohttp.ClientSession) -> dict[str, str]:
+        """`user`/`contract` per EVM chain from eth_getCode, or a finer cached type.
+
+        Chains whose RPC call failed are left out of the result and not cached.
+        """
+        types: dict[str, str] = await cls.lookup(address=address, chain_list=chain_list)
+        missing: list[str] = [c for c in chain_list if c not in types]
+        results: list[list[Any] | BaseException] = await asyncio.gather(
+            *[cls.rpc_batch(chain=c, calls=[('eth_getCode', [address, 'latest'])], session=session) for c in missing],
+            return_exceptions=True,
+        )
+        fetched: dict[str, str] = {}
+        for chain, result in zip(missing, results):
+            if isinstance(result, BaseException):
+                logger.warning(msg=f'eth_getCode error {chain} {address}: {result}')
+                continue
+            code: str | None = result[0]
+            if code is not None:
+                fetched[chain] = cls.USER if code in ('0x', '0x0') else cls.CONTRACT
+        if fetched:
+            await cls.store(address=address, types=fetched)
+        types.update(fetched)
+        return types
+
+    @classmethod
+    async def classify(cls, address: str, chain: str, session: aiohttp.ClientSession) -> str:
+        """`user`, `token` or `unknown` for one EVM chain.
+
+        eth_getCode and the three ERC-20 probe calls share one batch, so an
+        uncached address costs a single round trip.
+        """
+        cached: str | None = (await cls.lookup(address=address, chain_list=[chain])).get(chain)
+        if cached in (cls.USER, cls.TOKEN, cls.UNKNOWN):
+            return cached
+
+        arg: str = address.lower()[2:].rjust(64, '0')
+        calls: list[tuple[str, list]] = [
+            ('eth_getCode', [address, 'latest']),
+            ('eth_call', [dict(to=address, data=TOTAL_SUPPLY_SELECTOR), 'latest']),
+            ('eth_call', [dict(to=address, data=BALANCE_OF_SELECTOR + arg), 'latest']),
+            ('eth_call', [dict(to=address, data=ALLOWANCE_SELECTOR + arg + arg), 'latest']),
+        ]
+        try:
+            code, *probes = await cls.rpc_batch(chain=chain, calls=calls, session=session)
+        except Exception as e:
+            logger.warning(msg=f'Account type error {chain} {address}: {e}')
+            return cls.UNKNOWN
+        if code is None:
+            return cls.UNKNOWN
+        if code in ('0x', '0x0'):
+            account_type: str = cls.USER
+        else:
+            # Each probe has to return at least one ABI word, as web3 decoding required.
+            account_type = cls.TOKEN if all(p and len(p) >= 66 for p in probes) else cls.UNKNOWN
+        await cls.store(address=address, types={chain: account_type})
+        return account_type
@@ -0,0 +1,94 @@
+from typing import Any, Awaitable, Callable
+import asyncio
+import json
+import time
+
+from django.conf import settings
+
+from utils.redis_pool import RedisPool
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+BalanceFetcher = Callable[[], Awaitable[tuple[dict[str, Any], str | None]]]
+
+
+class BalanceCache():
+    """Stale-while-revalidate cache for per (chain, address) balances.
+
+    Entries younger than BALANCE_CACHE_FRESH_TTL are served as they are. Older
+    entries are still served until BALANCE_CACHE_STALE_TTL, while one
+    background refresh per key (guarded by a Redis lock across workers)
+    fetches a new copy. Every returned payload carries a `meta` dict with
+    `fetched_at`, `source` (upstream) and `cache` (fresh/stale/miss).
+    """
+    key_prefix: str = 'satoshi:balance'
+    _refresh_tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    def _key(cls, chain: str, address: str) -> str:
+        return f'{cls.key_prefix}:{chain}:{address}'
+
+    @classmethod
+    async def get_or_fetch(cls, chain: str, address: str, fetch: BalanceFetcher) -> dict[str, Any]:
+        entry: dict[str, Any] | None = await cls.read(chain=chain, address=address)
+        if entry:
+            if time.time() - entry['fetched_at'] < settings.BALANCE_CACHE_FRESH_TTL:
+                return cls._with_meta(entry=entry, cache_status='fresh')
+            cls._schedule_refresh(chain=chain, address=address, fetch=fetch)
+            return cls._with_meta(entry=entry, cache_status='stale')
+
+        entry = await cls.refresh(chain=chain, address=address, fetch=fetch)
+        return cls._with_meta(entry=entry, cache_status='miss')
+
+    @classmethod
+    async def read(cls, chain: str, address: str) -> dict[str, Any] | None:
+        try:
+            raw: str | None = await RedisPool.client().get(name=cls._key(chain=chain, address=address))
+        except Exception as e:
+            logger.warning(msg=f'Balance cache read error: {e}')
+            return
+        return json.loads(s=raw) if raw else None
+
+    @classmethod
+    async def write(cls, chain: str, address: str, entry: dict[str, Any]) -> None:
+        try:
+            await RedisPool.client().set(
+                name=cls._key(chain=chain, address=address),
+                value=json.dumps(obj=entry),
+                ex=settings.BALANCE_CACHE_STALE_TTL,
+            )
+        except Exception as e:
+            logger.warning(msg=f'Balance cache write error: {e}')
+
+    @classmethod
+    async def refresh(cls, chain: str, address: str, fetch: BalanceFetcher) -> dict[str, Any]:
+        data, source = await fetch()
+        entry: dict[str, Any] = dict(data=data, fetched_at=int(time.time()), source=source)
+        # A missing source means every upstream attempt failed; never cache that placeholder.
+        if source:
+            await cls.write(chain=chain, address=address, entry=entry)
+        return entry
+
+    @classmethod
+    def _schedule_refresh(cls, chain: str, address: str, fetch: BalanceFetcher) -> None:
+        task: asyncio.Task = asyncio.create_task(cls._locked_refresh(chain=chain, address=address, fetch=fetch))
+        cls._refresh_tasks.add(task)
+        task.add_done_callback(cls._refresh_tasks.discard)
+
+    @classmethod
+    async def _locked_refresh(cls, chain: str, address: str, fetch: BalanceFetcher) -> None:
+        lock_key: str = f'{cls._key(chain=chain, address=address)}:refresh'
+        try:
+            if not await RedisPool.client().set(name=lock_key, value=1, nx=True, ex=settings.BALANCE_CACHE_REFRESH_LOCK_TTL):
+                return
+            await cls.refresh(chain=chain, address=address, fetch=fetch)
+        except Exception as e:
+            logger.warning(msg=f'Balance cache refresh error {chain} {address}: {e}')
+
+    @staticmethod
+    def _with_meta(entry: dict[str, Any], cache_status: str) -> dict[str, Any]:
+        data: dict[str, Any] = entry['data']
+        data['meta'] = dict(fetched_at=entry['fetched_at'], source=entry['source'], cache=cache_status)
+        return data
@@ -0,0 +1,220 @@
+from dataclasses import dataclass
+from typing import Any
+import heapq
+import os
+import re
+
+from utils import constants
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# Covalent/zkSync/Solana placeholders for the native token.
+NATIVE_ADDRESS_PATTERN: re.Pattern = re.compile(pattern=r"0xe{40}|1{32}|0x0{36}800a")
+S3_DOMAIN: str | None = os.getenv(key='S3_DOMAIN')
+# Airdrop spam advertises a claim site in its symbol/name.
+SPAM_NAME_PATTERN: re.Pattern = re.compile(pattern=r"https?://|www\.|\.(com|io|org|net|xyz|app|site|vip)\b|\bclaim|\bvisit|\breward", flags=re.IGNORECASE)
+
+
+def chain_info(chain: str, chain_id: str | None = None) -> dict[str, str]:
+    return dict(
+        id = str(object=chain_id or constants.CHAIN_DICT[chain]['id']),
+        name = chain,
+        logo = f"{S3_DOMAIN}/chains/logo/{chain}.png",
+    )
+
+
+def is_spam_name(*names: str | None) -> bool:
+    return any(n and SPAM_NAME_PATTERN.search(n) for n in names)
+
+
+@dataclass(slots=True)
+class TokenBalance():
+    symbol: str | None
+    name: str | None
+    decimals: int | None
+    amount: Any
+    address: str
+    price_usd: float | None
+    value_usd: float | None
+    price_change_24h: float | None
+    logo: str | None
+    is_spam: bool = False
+
+    @classmethod
+    def from_cqt(cls, item: dict[str, Any]) -> 'TokenBalance':
+        price_usd: float | None = item.get('quote_rate')
+        price_usd_24h: float | None = item.get('quote_rate_24h')
+        return cls(
+            item['contract_ticker_symbol'],
+            item['contract_name'],
+            item['contract_decimals'],
+            item['balance'],
+            NATIVE_ADDRESS_PATTERN.sub(constants.ZERO_ADDRESS, item['contract_address']),
+            price_usd,
+            item['quote'],
+            round((price_usd - price_usd_24h) / price_usd_24h * 100, 4) if price_usd and price_usd_24h else None,
+            item['logo_url'],
+            bool(item.get('is_spam')),
+        )
+
+    @classmethod
+    def from_merlin(cls, item: dict[str, Any]) -> 'TokenBalance':
+        return cls(
+            item['symbol'],
+            item['name'],
+            item['decimals'],
+            int(float(item.get('balance', 0)))/(10 ** int(item['decimals'])),
+            item['token_address'],
+            None,
+            None,
+            None,
+            None,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'symbol': self.symbol,
+            'name': self.name,
+            'decimals': self.decimals,
+            'amount': self.amount,
+            'address': self.address,
+            'price_usd': self.price_usd,
+            'value_usd': self.value_usd,
+            'price_change_24h': self.price_change_24h,
+            'logo': self.logo,
+            'is_spam': self.is_spam,
+        }
+
+
+@dataclass(slots=True)
+class ChainBalance():
+    address: str
+    chain: dict[str, str]
+    tokens: list[TokenBalance]
+    value: float | None
+
+    @classmethod
+    def from_cqt(cls, address: str, data: dict[str, Any]) -> 'ChainBalance':
+        chain: str = constants.CQT_CHAIN_DICT[data['chain_name']]
+        tokens: list[TokenBalance] = []
+        value: float = 0
+        append = tokens.append
+        for item in data['items']:
+            token: TokenBalance = TokenBalance.from_cqt(item=item)
+            append(token)
+            value += token.value_usd or 0
+        return cls(address, chain_info(chain=chain, chain_id=data['chain_id']), tokens, value)
+
+    @classmethod
+    def from_merlin(cls, address: str, chain: str, items: list[dict[str, Any]]) -> 'ChainBalance':
+        tokens: list[TokenBalance] = []
+        append = tokens.append
+        for item in items:
+            try:
+                append(TokenBalance.from_merlin(item=item))
+            except Exception as e:
+                logger.warning(msg=f'Merlin token parse error: {e}')
+        return cls(address, chain_info(chain=chain), tokens, None)
+
+    @classmethod
+    def empty(cls, address: str, chain: str) -> 'ChainBalance':
+        return cls(address, chain_info(chain=chain), [], 0)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'address': self.address,
+            'value': self.value,
+            'tokens': [t.to_dict() for t in self.tokens],
+            'chain': self.chain,
+        }
+
+
+@dataclass(slots=True)
+class BalanceFilter():
+    """Server-side trimming of a chain balance's token list.
+
+    Works on the cached dict form, so one cached payload serves every filter
+    combination. `value` keeps the unfiltered total; `filtered` reports how
+    many tokens each rule dropped. Spam is Covalent's flag or a claim-site
+    name; the name check runs here, only for exclude_spam, not while
+    normalising every fetched token.
+    """
+    min_value_usd: float | None = None
+    exclude_spam: bool = False
+    top: int | None = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.min_value_usd is not None or self.exclude_spam or self.top)
+
+    def apply(self, data: dict[str, Any]) -> dict[str, Any]:
+        if not self.active or not data:
+            return data
+        tokens: list[dict[str, Any]] = []
+        spam: int = 0
+        dust: int = 0
+        for token in data.get('tokens', []):
+            if self.exclude_spam and (token.get('is_spam') or is_spam_name(token.get('symbol'), token.get('name'))):
+                spam += 1
+            elif self.min_value_usd is not None and (token.get('value_usd') or 0) < self.min_value_usd:
+                dust += 1
+            else:
+                tokens.append(token)
+        top: int = 0
+        if self.top and len(tokens) > self.top:
+            top = len(tokens) - self.top
+            tokens = heapq.nlargest(self.top, tokens, key=lambda t: t.get('value_usd') or 0)
+        return dict(data, tokens=tokens, filtered=dict(spam=spam, dust=dust, top=top))
+
+
+class _Totals():
+    __slots__ = ('value', 'weighted_change', 'weight')
+
+    def __init__(self) -> None:
+        self.value: float = 0
+        self.weighted_change: float = 0
+        self.weight: float = 0
+
+    def to_dict(self) -> dict[str, float | None]:
+        return dict(
+            value=self.value,
+            change_24h=round(self.weighted_change / self.weight, 4) if self.weight else None,
+        )
+
+
+def summarize(balances: dict[str, dict[str, dict[str, Any]]]) -> dict[str, Any]:
+    """Per-wallet, per-chain and overall USD totals from multi_get_balances output.
+
+    The 24h change is weighted by each token's current value_usd; tokens
+    without a price change do not count towards the weight. One pass over
+    the token rows.
+    """
+    total: _Totals = _Totals()
+    chains: dict[str, _Totals] = {}
+    wallets: dict[str, _Totals] = {}
+    wallet_chains: dict[str, dict[str, float]] = {}
+    for chain, by_address in balances.items():
+        chain_totals: _Totals = chains.setdefault(chain, _Totals())
+        for address, data in by_address.items():
+            wallet_totals: _Totals = wallets.setdefault(address, _Totals())
+            value: float = data.get('value') or 0
+            weighted_change: float = 0
+            weight: float = 0
+            for token in data.get('tokens', ()):
+                value_usd: float | None = token.get('value_usd')
+                change: float | None = token.get('price_change_24h')
+                if value_usd and change is not None:
+                    weighted_change += value_usd * change
+                    weight += value_usd
+            for totals in (total, chain_totals, wallet_totals):
+                totals.value += value
+                totals.weighted_change += weighted_change
+                totals.weight += weight
+            wallet_chains.setdefault(address, {})[chain] = value
+    return dict(
+        total=total.to_dict(),
+        chains={k: v.to_dict() for k, v in chains.items()},
+        wallets={k: dict(v.to_dict(), chains=wallet_chains[k]) for k, v in wallets.items()},
+    )
@@ -1,14 +1,23 @@
 import os
 import json
+import hashlib
 from typing import Any
 import requests
+from django.conf import settings
 from django.core.cache import cache
 from utils import constants
 from urllib.parse import urljoin
 
 from utils.fetch import MultiFetch
+from w3.token_meta import TokenMetaStore
+from utils.resilience import http_request
+from utils.single_flight import single_flight
 from subscribe import models as subscribe_models
 
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
 
 class DexTools():
     domain: str | None = os.getenv(key='DEX_DOMAIN')
@@ -21,6 +30,19 @@ class DexTools():
     def token_base(cls, chain: str, address: str) -> dict | None:
         if address == constants.ZERO_ADDRESS:
             return constants.CHAIN_DICT[chain]['token']
+        data: dict[str, Any] = TokenMetaStore.compose(
+            chain=chain,
+            address=address,
+            fields=('symbol', 'name', 'decimals', 'logo', 'address'),
+            fetch=lambda stale: cls.fetch_token_base(chain=chain, address=address) or {},
+        )
+        if not data.get('symbol'):
+            return
+        return data
+
+    @classmethod
+    @single_flight(key=lambda cls, chain, address: f'dextools:token_base:{chain}:{address}')
+    def fetch_token_base(cls, chain: str, address: str) -> dict | None:
         urls: list[str] = [
             f'{cls.domain}/token/{chain}/{address}',
         ]
@@ -38,13 +60,8 @@ class DexTools():
         return data
 
     @classmethod
-    def token_info(cls, chain: str, address: str) -> dict:
-        urls: list[str] = [
-            f'{cls.domain}/token/{chain}/{address}/info',
-        ]
-        res: dict[str, Any] = MultiFetch.fetch_multiple_urls(headers=cls.headers, urls=urls)
-        data: dict[str, Any] = res[urls[0]].get('data') or dict()
-        return data
+    def token_info_url(cls, chain: str, address: str) -> str:
+        return f'{cls.domain}/token/{chain}/{address}/info'
     
 
 class GeckoAPI():
@@ -59,44 +76,58 @@ class GeckoAPI():
         url: str = f'{cls.app_domain}/search?query={kw}'
         payload: dict[str, Any] = {}
         headers: dict[str, str] = {'User-Agent': 'PostmanRuntime/7.37.3'}
-        response: requests.Response = requests.request(method="GET", url=url, headers=headers, data=payload)
+        try:
+            response: requests.Response = http_request(method="GET", url=url, headers=headers, data=payload)
+        except Exception as e:
+            logger.error(msg=f'Gecko search error: {e}')
+            return {}
         if response.status_code != 200:
             return {}
         res: dict[str, Any] | None = response.json().get('data', {}).get('attributes', {})
         return res
 
     @classmethod
-    def token_info(cls, chain: str, address: str) -> dict:
-        urls: list[str] = [
-            f'{cls.domain}/networks/{chain}/tokens/{address}',
-            f'{cls.domain}/networks/{chain}/tokens/{address}/info',
-            f'{cls.domain}/networks/{chain}/tokens/{address}/pools'
-        ]
-        res: dict[str, Any] = MultiFetch.fetch_multiple_urls(headers=cls.headers, urls=urls)
-        if not res:
-            return dict()
-        base: dict[str, Any] = res[urls[0]].get('data', {}).get('attributes', {})
-        info: dict[str, Any] = res[urls[1]].get('data', {}).get('attributes', {})
-        pools: list[dict] = res[urls[2]].get('data', {})
+    def token_urls(cls, chain: str, address: str) -> dict[str, str]:
+        token_url: str = f'{cls.domain}/networks/{chain}/tokens/{address}'
+        return dict(base=token_url, info=f'{token_url}/info', pools=f'{token_url}/pools')
+
+    @staticmethod
+    def parse_token_part(part: str, res: dict[str, Any]) -> dict[str, Any]:
+        """Fields carried by one token endpoint response; empty when the request failed."""
+        if part == 'base':
+            base: dict[str, Any] = res.get('data', {}).get('attributes', {})
+            if not base:
+                return {}
+            return dict(
+                address = base.get('address'),
+                logo = base['image_url'] if base.get('image_url') and base['image_url'] != 'missing.png' else None,
+                name = base.get('name'),
+                symbol = base.get('symbol'),
+                decimals = base.get('decimals'),
+                price = base.get('price_usd'),
+                liquidity = base.get('total_reserve_in_usd'),
+                market_cap = base.get('market_cap_usd'),
+                volume = base.get('volume_usd', {}).get('h24'),
+            )
+        if part == 'info':
+            info: dict[str, Any] = res.get('data', {}).get('attributes', {})
+            if not info:
+                return {}
+            return dict(
+                description = info.get('description'),
+                twitter = info.get('twitter_handle'),
+                telegram = info.get('telegram_handle'),
+                websites = info.get('websites'),
+            )
+        # A failed request comes back as {data: {}}, an empty pool list as {data: []}.
+        pools: list[dict] | dict = res.get('data', {})
+        if not isinstance(pools, list):
+            return {}
         pool: dict[str, Any] = pools[0].get('attributes', {}) if len(pools) > 0 else {}
-        data: dict[str, Any] = dict(
-            address = base.get('address'),
-            logo = base['image_url'] if base.get('image_url') and base['image_url'] != 'missing.png' else None,
-            name = base.get('name'),
-            symbol = base.get('symbol'),
-            decimals = base.get('decimals'),
-            description = info.get('description'),
-            price = base.get('price_usd'),
-            liquidity = base.get('total_reserve_in_usd'),
-            market_cap = base.get('market_cap_usd'),
-            volume = base.get('volume_usd', {}).get('h24'),
-            twitter = info.get('twitter_handle'),
-            telegram = info.get('telegram_handle'),
-            websites = info.get('websites'),
+        return dict(
             price_change = pool.get('price_change_percentage', {}).get('h24'),
             price_change_24h = pool.get('price_change_percentage', {}).get('h24'),
         )
-        return data
     
 
 class AveAPI():
@@ -117,7 +148,11 @@ class AveAPI():
         url: str = f'{cls.domain}/tokens/query?keyword={kw}'
         payload: dict[str, Any] = {}
         headers: dict[str, str | None] = {"X-Auth": cls.get_auth()}
-        response: requests.Response = requests.request(method="GET", url=url, headers=headers, data=payload)
+        try:
+            response: requests.Response = http_request(method="GET", url=url, headers=headers, data=payload)
+        except Exception as e:
+            logger.error(msg=f'Ave search error: {e}')
+            return []
         if response.status_code != 200:
             return []
         res: list[dict] = response.json().get('data', {}).get('token_list', [])
@@ -131,37 +166,17 @@ class DefinedAPI():
         'Content-Type': 'application/json'
     }
 
-    @classmethod
-    def search(cls, kw: str) -> list[dict[str, Any]]:
-        url: str = f'{cls.domain}'
-        headers: dict[str, str] = cls.headers
-        payload: dict[str, Any] = {
-            "query": """{
-            filterTokens(
-                filters: {
-                liquidity: { gt: %s }
-                # network: [1]
-                }
-                limit: 200
-                offset: 0
-                phrase: "%s"
-            ) {
-                results {
+    # Constant document; the keyword, chains and paging go in as variables so the upstream can cache the parsed query.
+    search_query: str = """query FilterTokens($phrase: String, $filters: TokenFilters, $limit: Int, $offset: Int) {
+        filterTokens(phrase: $phrase, filters: $filters, limit: $limit, offset: $offset) {
+            results {
                 change24
-                txnCount24
                 volume24
                 isScam
                 holders
                 liquidity
                 marketCap
                 priceUSD
-                pair {
-                    token0
-                    token1
-                }
-                exchanges {
-                    name
-                }
                 token {
                     address
                     decimals
@@ -169,23 +184,79 @@ class DefinedAPI():
                     networkId
                     symbol
                     info {
-                    imageSmallUrl
+                        imageSmallUrl
                     }
                 }
-                }
-            }
             }
-            """ % (5000 if len(kw) < 30 else 0, kw)
         }
-        response: requests.Response = requests.request(method="POST", url=url, headers=headers, data=json.dumps(obj=payload))
+    }"""
+    network_ids: list[int] = [int(c['id']) for c in constants.CHAIN_DICT.values()]
+
+    @classmethod
+    def search_page(cls, kw: str, offset: int) -> list[dict[str, Any]] | None:
+        """One page of filterTokens results; None when the request or the query failed."""
+        payload: dict[str, Any] = dict(
+            query=cls.search_query,
+            variables=dict(
+                phrase=kw,
+                filters=dict(network=cls.network_ids, liquidity=dict(gt=5000 if len(kw) < 30 else 0)),
+                limit=settings.DEFINED_SEARCH_PAGE_SIZE,
+                offset=offset,
+            ),
+        )
+        try:
+            response: requests.Response = http_request(method="POST", url=f'{cls.domain}', headers=cls.headers, data=json.dumps(obj=payload))
+        except Exception as e:
+            logger.error(msg=f'Defined search error: {e}')
+            return None
         if response.status_code != 200:
-            return []
-        res: list[dict[str, Any]] | None = response.json().get('data', {}).get('filterTokens', {}).get('results', [])
+            return None
+        body: dict[str, Any] = response.json()
+        # GraphQL reports failures with HTTP 200; those must not be cached as an empty result.
+        if body.get('errors') or not body.get('data'):
+            logger.error(msg=f'Defined search error: {body.get("errors")}')
+            return None
+        return (body['data'].get('filterTokens') or {}).get('results') or []
+
+    @classmethod
+    def search(cls, kw: str) -> list[dict[str, Any]]:
+        """Tokens matching `kw`; short keywords keep symbol prefixes only.
+
+        filterTokens has no prefix filter (`phrase` matches anywhere in
+        name, symbol or address), so the prefix check stays here. Pages of
+        DEFINED_SEARCH_PAGE_SIZE are read until DEFINED_SEARCH_LIMIT matches
+        are found, the results run out or DEFINED_SEARCH_MAX_PAGES is hit.
+        """
+        kw = kw.strip()
+        cache_key: str = f'satoshi:defined_search:{hashlib.md5(kw.lower().encode()).hexdigest()}'
+        data: list[dict[str, Any]] | None = cache.get(key=cache_key)
+        if data is not None:
+            return data
+
+        data = []
+        for page in range(settings.DEFINED_SEARCH_MAX_PAGES):
+            res: list[dict[str, Any]] | None = cls.search_page(kw=kw, offset=page * settings.DEFINED_SEARCH_PAGE_SIZE)
+            if res is None:
+                # Partial results are served but not cached.
+                return data
+            data.extend(cls.parse_results(kw=kw, res=res))
+            if len(data) >= settings.DEFINED_SEARCH_LIMIT or len(res) < settings.DEFINED_SEARCH_PAGE_SIZE or len(kw) >= 30:
+                break
+        data = data[:settings.DEFINED_SEARCH_LIMIT]
+        cache.set(key=cache_key, value=data, timeout=settings.DEFINED_SEARCH_CACHE_TTL)
+        return data
+
+    @staticmethod
+    def parse_results(kw: str, res: list[dict[str, Any]]) -> list[dict[str, Any]]:
         data: list[dict[str, Any]] = []
         for d in res:
             token: dict = d.get('token', {})
+            # Defined matches the phrase anywhere in name/symbol/address; short keywords still only keep symbol prefixes.
             if len(kw) < 30 and not str(token.get('symbol', '')).lower().startswith(kw.lower()):
                 continue
+            chain: str | None = constants.CHAIN_DICT_FROM_ID.get(str(token.get('networkId')))
+            if not chain:
+                continue
             coin_data: dict = dict(
                 logo = token.get('info', {}).get('imageSmallUrl'),
                 address = token.get('address'),
@@ -200,14 +271,8 @@ class DefinedAPI():
                 volume = d.get('volume24'),
                 liquidity = d.get('liquidity'),
                 is_scam = d.get('isScam'),
+                chain = dict(name=chain, id = str(object=constants.CHAIN_DICT[chain]['id']), logo = f"{os.getenv(key='S3_DOMAIN')}/chains/logo/{chain}.png"),
+                is_supported = True,
             )
-            chain: str | None = constants.CHAIN_DICT_FROM_ID.get(str(token.get('networkId')))
-            if not chain:
-                coin_data['chain'] = dict(name=None, id = token.get('networkId'), logo = None)
-                coin_data['is_supported'] = False
-                continue
-            else:
-                coin_data['chain'] = dict(name=chain, id = str(object=constants.CHAIN_DICT[chain]['id']), logo = f"{os.getenv(key='S3_DOMAIN')}/chains/logo/{chain}.png")
-                coin_data['is_supported'] = True
             data.append(coin_data)
         return data
\ No newline at end of file
@@ -0,0 +1,46 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+
+import base58
+from eth_keys import keys
+from nacl.signing import SigningKey
+
+# Kept free of Django imports: the pool's spawned workers import only this module.
+_executor: ProcessPoolExecutor | None = None
+_executor_lock: threading.Lock = threading.Lock()
+
+
+def derive_keys(platform: str, private_key: str) -> tuple[str, str] | None:
+    """(public_key, address) for an imported private key, None if it is malformed."""
+    try:
+        if platform == 'EVM':
+            if len(private_key) < 64 or len(private_key) > 66:
+                return
+            private_key_hex: str = private_key[2:] if private_key.startswith("0x") else private_key
+            public_key = keys.PrivateKey(bytes.fromhex(private_key_hex)).public_key
+            return str(object=public_key), public_key.to_checksum_address()
+        elif platform == 'SOL':
+            if len(private_key) > 90 or len(private_key) < 85:
+                return
+            private_key_bytes: bytes = base58.b58decode(private_key)
+            signing_key: SigningKey = SigningKey(seed=private_key_bytes[:32])
+            public_key: str = base58.b58encode(signing_key.verify_key.encode()).decode(encoding='utf-8')
+            return public_key, public_key
+    except Exception:
+        return
+
+
+def _derive_pair(item: tuple[str, str]) -> tuple[str, str] | None:
+    return derive_keys(*item)
+
+
+def derive_many(items: list[tuple[str, str]], processes: int, threshold: int) -> list[tuple[str, str] | None]:
+    """derive_keys over (platform, private_key) pairs, in a process pool once the batch reaches `threshold`."""
+    if len(items) < threshold:
+        return [derive_keys(*item) for item in items]
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(method='spawn'))
+    return list(_executor.map(_derive_pair, items, chunksize=max(1, len(items) // (processes * 4))))
@@ -0,0 +1,200 @@
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utils import constants
+
+import logging
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+STATIC: str = 'static'
+MARKET: str = 'market'
+
+FIELD_CLASSES: dict[str, tuple[str, ...]] = {
+    STATIC: ('address', 'logo', 'name', 'symbol', 'decimals', 'description', 'twitter', 'telegram', 'websites'),
+    MARKET: ('price', 'liquidity', 'market_cap', 'volume', 'price_change', 'price_change_24h', 'holders'),
+}
+FIELD_CLASS_OF: dict[str, str] = {field: field_class for field_class, fields in FIELD_CLASSES.items() for field in fields}
+
+# Receives the stale field classes and returns whatever fields it could fetch; a field missing from the result is not cached.
+TokenMetaFetcher = Callable[[list[str]], dict[str, Any]]
+
+
+class TokenMetaStore():
+    """Token metadata per (chain, address), split into field classes.
+
+    Static fields (name, symbol, decimals, logo, socials) live for
+    TOKEN_META_STATIC_TTL, market fields (price, liquidity, volume,
+    holders) for TOKEN_META_MARKET_TTL. Each class is one entry in an
+    in-process LRU in front of Redis, so a response is composed from the
+    fresh classes and only the stale ones are fetched again. Fields the
+    fetcher could not return are cached as None for TOKEN_META_MISS_TTL at
+    most, so tokens a vendor does not know are not refetched every time.
+    """
+    key_prefix: str = 'satoshi:token_meta'
+
+    _local: OrderedDict[str, dict[str, Any]] = OrderedDict()
+    _lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def ttl(field_class: str) -> int:
+        return settings.TOKEN_META_STATIC_TTL if field_class == STATIC else settings.TOKEN_META_MARKET_TTL
+
+    @classmethod
+    def _key(cls, field_class: str, chain: str, address: str) -> str:
+        # EVM addresses are case-insensitive (checksum casing only); Solana's base58 ones are not.
+        if constants.CHAIN_DICT.get(chain, {}).get('platform') == 'EVM':
+            address = address.lower()
+        return f'{cls.key_prefix}:{field_class}:{chain}:{address}'
+
+    @classmethod
+    def _local_get(cls, key: str) -> dict[str, Any] | None:
+        with cls._lock:
+            entry: dict[str, Any] | None = cls._local.get(key)
+            if entry is None:
+                return None
+            if entry['expires_at'] <= time.time():
+                del cls._local[key]
+                return None
+            cls._local.move_to_end(key)
+            return entry
+
+    @classmethod
+    def _local_set(cls, key: str, entry: dict[str, Any]) -> None:
+        with cls._lock:
+            cls._local[key] = entry
+            cls._local.move_to_end(key)
+            while len(cls._local) > settings.TOKEN_META_LRU_SIZE:
+                cls._local.popitem(last=False)
+
+    @classmethod
+    def read(cls, field_class: str, chain: str, address: str) -> dict[str, Any] | None:
+        key: str = cls._key(field_class=field_class, chain=chain, address=address)
+        entry: dict[str, Any] | None = cls._local_get(key=key)
+        if entry is not None:
+            return entry
+        try:
+            entry = cache.get(key=key)
+        except Exception as e:
+            logger.warning(msg=f'Token meta read error: {e}')
+            return None
+        return cls._loaded(key=key, entry=entry)
+
+    @classmethod
+    async def aread(cls, field_class: str, chain: str, address: str) -> dict[str, Any] | None:
+        key: str = cls._key(field_class=field_class, chain=chain, address=address)
+        entry: dict[str, Any] | None = cls._local_get(key=key)
+        if entry is not None:
+            return entry
+        try:
+            entry = await cache.aget(key=key)
+        except Exception as e:
+            logger.warning(msg=f'Token meta read error: {e}')
+            return None
+        return cls._loaded(key=key, entry=entry)
+
+    @classmethod
+    def _loaded(cls, key: str, entry: dict[str, Any] | None) -> dict[str, Any] | None:
+        if entry is not None and entry['expires_at'] > time.time():
+            cls._local_set(key=key, entry=entry)
+            return entry
+        return None
+
+    @classmethod
+    def _merged(cls, field_class: str, current: dict[str, Any] | None, data: dict[str, Any], ttl: float | None=None) -> dict[str, Any]:
+        expires_at: float = time.time() + (ttl or cls.ttl(field_class=field_class))
+        if current is not None:
+            # Merging keeps the older expiry so no field outlives its own TTL.
+            data = dict(current['data'], **data)
+            expires_at = min(expires_at, current['expires_at'])
+        return dict(data=data, expires_at=expires_at)
+
+    @classmethod
+    def write(cls, field_class: str, chain: str, address: str, data: dict[str, Any], ttl: float | None=None) -> None:
+        key: str = cls._key(field_class=field_class, chain=chain, address=address)
+        entry: dict[str, Any] = cls._merged(field_class=field_class, current=cls.read(field_class=field_class, chain=chain, address=address), data=data, ttl=ttl)
+        cls._local_set(key=key, entry=entry)
+        try:
+            cache.set(key=key, value=entry, timeout=max(1, int(entry['expires_at'] - time.time())))
+        except Exception as e:
+            logger.warning(msg=f'Token meta write error: {e}')
+
+    @classmethod
+    async def awrite(cls, field_class: str, chain: str, address: str, data: dict[str, Any]) -> None:
+        key: str = cls._key(field_class=field_class, chain=chain, address=address)
+        entry: dict[str, Any] = cls._merged(field_class=field_class, current=await cls.aread(field_class=field_class, chain=chain, address=address), data=data)
+        cls._local_set(key=key, entry=entry)
+        try:
+            await cache.aset(key=key, value=entry, timeout=max(1, int(entry['expires_at'] - time.time())))
+        except Exception as e:
+            logger.warning(msg=f'Token meta write error: {e}')
+
+    @staticmethod
+    def _wanted(fields: Iterable[str]) -> dict[str, list[str]]:
+        wanted: dict[str, list[str]] = {}
+        for field in fields:
+            wanted.setdefault(FIELD_CLASS_OF[field], []).append(field)
+        return wanted
+
+    @staticmethod
+    def _split(data: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        parts: dict[str, dict[str, Any]] = {}
+        for field_class, names in FIELD_CLASSES.items():
+            part: dict[str, Any] = {name: data[name] for name in names if name in data}
+            if part:
+                parts[field_class] = part
+        return parts
+
+    @classmethod
+    def get(cls, chain: str, address: str, fields: Iterable[str]) -> tuple[dict[str, Any], list[str]]:
+        """Cached values of `fields` and the field classes that are stale or incomplete."""
+        data: dict[str, Any] = {}
+        stale: list[str] = []
+        for field_class, names in cls._wanted(fields=fields).items():
+            entry: dict[str, Any] | None = cls.read(field_class=field_class, chain=chain, address=address)
+            if entry is None or any(name not in entry['data'] for name in names):
+                stale.append(field_class)
+                continue
+            data.update({name: entry['data'][name] for name in names})
+        return data, stale
+
+    @classmethod
+    async def aget(cls, chain: str, address: str, fields: Iterable[str]) -> tuple[dict[str, Any], list[str]]:
+        data: dict[str, Any] = {}
+        stale: list[str] = []
+        for field_class, names in cls._wanted(fields=fields).items():
+            entry: dict[str, Any] | None = await cls.aread(field_class=field_class, chain=chain, address=address)
+            if entry is None or any(name not in entry['data'] for name in names):
+                stale.append(field_class)
+                continue
+            data.update({name: entry['data'][name] for name in names})
+        return data, stale
+
+    @classmethod
+    def put(cls, chain: str, address: str, data: dict[str, Any]) -> None:
+        for field_class, part in cls._split(data=data).items():
+            cls.write(field_class=field_class, chain=chain, address=address, data=part)
+
+    @classmethod
+    async def aput(cls, chain: str, address: str, data: dict[str, Any]) -> None:
+        for field_class, part in cls._split(data=data).items():
+            await cls.awrite(field_class=field_class, chain=chain, address=address, data=part)
+
+    @classmethod
+    def compose(cls, chain: str, address: str, fields: Iterable[str], fetch: TokenMetaFetcher) -> dict[str, Any]:
+        fields = list(fields)
+        data, stale = cls.get(chain=chain, address=address, fields=fields)
+        if stale:
+            fetched: dict[str, Any] = fetch(stale)
+            cls.put(chain=chain, address=address, data=fetched)
+            missed: dict[str, Any] = {field: None for field in fields if FIELD_CLASS_OF[field] in stale and field not in fetched}
+            for field_class, part in cls._split(data=missed).items():
+                # Merging keeps the earlier expiry, so the whole class is retried after the miss TTL.
+                cls.write(field_class=field_class, chain=chain, address=address, data=part, ttl=min(cls.ttl(field_class=field_class), settings.TOKEN_META_MISS_TTL))
+            data.update({field: fetched.get(field) for field in fields if FIELD_CLASS_OF[field] in stale})
+        return {field: data.get(field) for field in fields}
@@ -1,16 +1,13 @@
-from typing import Any, Coroutine, Literal
+from typing import Any, AsyncIterator, Literal
 from django.core.cache import cache
 
 import json
 import os
-import time
-from eth_typing import ChecksumAddress
 import requests
 import re
-from base58 import b58decode
+from base58 import b58decode, b58encode
+from nacl.signing import SigningKey
 
-from web3 import Web3
-from web3.contract.contract import Contract
 
 import aiohttp
 from aiohttp import ClientTimeout
@@ -22,28 +19,19 @@ from eth_account.signers.local import (
 )
 
 from utils import constants
+from utils.http_pool import HttpPool
+from utils.rate_limit import RateLimiter
+from utils.resilience import retry
+from utils.single_flight import single_flight
+from w3.account import AccountClassifier
+from w3.balance_cache import BalanceCache
+from w3.balances import ChainBalance
 
 import logging
 
 logger: logging.Logger = logging.getLogger(name=__name__)
 
 
-def retry(retries: int=3, delay: int=1):
-    def wrapper(func: Any):
-        async def wrapped_f(*args, **kwargs) -> Any | None:
-            nonlocal delay
-            for attempt in range(1, retries + 1):
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    if attempt == retries:
-                        return
-                    delay *= 2  # Exponential backoff
-                    # await asyncio.sleep(delay)
-        return wrapped_f
-    return wrapper
-
-
 class WalletHandler():
     def __init__(self) -> None:
         self.evm_domain: str | None = os.getenv(key='WEB3_EVM_API')
@@ -62,71 +50,29 @@ class WalletHandler():
         return ""
 
     @classmethod
-    def account_type(cls, address: str, chain: str) -> Literal['token'] | Literal['unknown'] | Literal['user']:
-        w3 = Web3(provider=Web3.HTTPProvider(constants.CHAIN_DICT[chain]['rpc']))
-
-        def is_erc20_contract(a) -> bool:
-            contract: Contract = w3.eth.contract(address=Web3.to_checksum_address(a), abi=constants.ERC20_ABI)
-            try:
-                contract.functions.totalSupply().call()
-                contract.functions.balanceOf(a).call()
-                contract.functions.allowance(a, a).call()
-                return True
-            except:
-                return False
-
-        address: ChecksumAddress = Web3.to_checksum_address(address)
-        if w3.eth.get_code(account=address):
-            if is_erc20_contract(a=address):
-                return 'token'
-            else:
-                return 'unknown'
-        else:
-            return 'user'
-        
-    @classmethod
-    async def account_type_exclude_token(cls, address: str, chain: str, session: aiohttp.ClientSession) -> Literal['unknown'] | Literal['user']:
-        rpc_url: str = constants.CHAIN_DICT[chain]['rpc']
-
-        payload: str = json.dumps(obj={
-            "jsonrpc": "2.0",
-            "method": "eth_getCode",
-            "params": [address, "latest"],
-            "id": 1,
-        })
-
-        async with session.post(url=rpc_url, data=payload, headers={"Content-Type": "application/json"}) as response:
-            if response.status == 200:
-                data: dict[str, Any] = await response.json()
-                code: Any = data.get('result')
-                if code and code != '0x':
-                    return 'unknown'
-                else:
-                    return 'user'
-            else:
-                return 'unknown'
+    async def account_type(cls, address: str, chain: str) -> Literal['token'] | Literal['unknown'] | Literal['user']:
+        return await AccountClassifier.classify(address=address, chain=chain, session=HttpPool.session())
 
     async def multi_account_type_exclude_token(self, address: str, chain_list: list[str]) -> dict:
+        # Only EVM chains are probed; a Solana address is taken as a user on Solana chains.
+        platform: str = await self.identify_platform(address=address)
+        evm_chains: list[str] = [c for c in chain_list if constants.CHAIN_DICT[c]['platform'] == 'EVM'] if platform == 'EVM' else []
+        types: dict[str, str] = await AccountClassifier.classify_code(address=address, chain_list=evm_chains, session=HttpPool.session()) if evm_chains else {}
         results: dict[str, Any] = {}
-        async with aiohttp.ClientSession() as session:
-            tasks: list[Coroutine[Any, Any, Literal['unknown', 'user']]] = [self.account_type_exclude_token(address=address, chain=chain, session=session) for chain in chain_list]
-            data: list[Literal['unknown', 'user']] = await asyncio.gather(*tasks)
-            for chain, result in zip(chain_list, data):
-                results[chain] = result
+        for chain in chain_list:
+            if platform == 'SOL' and constants.CHAIN_DICT[chain]['platform'] == 'SOL':
+                results[chain] = 'user'
+            else:
+                results[chain] = 'user' if types.get(chain) == AccountClassifier.USER else 'unknown'
         return results
 
     def create_wallet(self, platform: str) -> None | tuple[Any, Any, str]:
         if platform == 'SOL':
-            url: str = f"{self.sol_domain}/account/keyPair/new"
-            try:
-                response: requests.Response = requests.request(method="GET", url=url, timeout=15)
-            except Exception as e:
-                logger.error(msg=f'Request timeout: {e}')
-                return
-            if response.status_code != 200:
-                return 
-            data: dict[str, Any] = response.json().get('data', {})
-            secretKey, publicKey = data.get('secretKey'), data.get('publicKey')
+            # Same layout as the Solana service's keypair: secretKey is base58(seed + public key).
+            signing_key: SigningKey = SigningKey.generate()
+            public_key_bytes: bytes = signing_key.verify_key.encode()
+            secretKey: str = b58encode(bytes(signing_key) + public_key_bytes).decode(encoding='utf-8')
+            publicKey: str = b58encode(public_key_bytes).decode(encoding='utf-8')
             address: str = publicKey
         else:
             account: LocalAccount = Account.create()
@@ -156,57 +102,57 @@ class WalletHandler():
     #     return results
 
     async def multi_get_balances(self, address_list: list[str], chain_list: list[str]) -> dict[str, dict[str, Any]]:
-        batch_size = 25
-        wait_time: float = 1.2
-        tasks: list = []
-        results: list[Any | BaseException] = []
         data: dict[str, dict[str, Any]] = {}
-
-        async with aiohttp.ClientSession() as session:
-            for address in address_list:
-                for chain in chain_list:
-                    if await self.identify_platform(address=address) == constants.CHAIN_DICT[chain]['platform']:
-                        tasks.append(self.get_balances(chain=chain, address=address, session=session))
-                    
-                    if len(tasks) >= batch_size:
-                        start_time: float = time.perf_counter()
-                        results.extend(await self._execute_batch(tasks))
-                        tasks.clear()
-                        elapsed_time: float = time.perf_counter() - start_time
-                        if elapsed_time < wait_time:
-                            await asyncio.sleep(wait_time - elapsed_time)
-            if tasks:
-                results.extend(await self._execute_batch(tasks))
-        
-        for result in results:
-            if isinstance(result, Exception):
-                continue
-            chain, address, json_data = result
+        async for chain, address, json_data in self.iter_balances(address_list=address_list, chain_list=chain_list):
             if chain not in data:
                 data[chain] = {}
             data[chain][address] = json_data
         return data
-    
-    async def _execute_batch(self, tasks: list) -> list[Any | BaseException]:
-        completed_tasks: list[Any | BaseException] = await asyncio.gather(*tasks, return_exceptions=True)
-        return completed_tasks
+
+    async def iter_balances(self, address_list: list[str], chain_list: list[str]) -> AsyncIterator[tuple[str, str, dict]]:
+        """Yield (chain, address, balances) for every matching pair as soon as it completes."""
+        tasks: list[asyncio.Task] = []
+
+        # Pacing is done per upstream by RateLimiter inside each request.
+        session: aiohttp.ClientSession = HttpPool.session()
+        for address in address_list:
+            platform: str = await self.identify_platform(address=address)
+            for chain in chain_list:
+                if platform == constants.CHAIN_DICT[chain]['platform']:
+                    tasks.append(asyncio.create_task(self.get_balances(chain=chain, address=address, session=session)))
+        try:
+            for task in asyncio.as_completed(tasks):
+                try:
+                    yield await task
+                except Exception as e:
+                    logger.warning(msg=f'Balance task error: {e}')
+        finally:
+            # The consumer may stop early (e.g. a streaming client disconnected).
+            for task in tasks:
+                task.cancel()
 
     async def get_balances(self, chain: str, address: str, session: aiohttp.ClientSession) -> tuple[str, str, dict]:
-        chain_data = dict(
-            id = str(object=constants.CHAIN_DICT[chain]['id']),
-            name = chain,
-            logo = f"{os.getenv(key='S3_DOMAIN')}/chains/logo/{chain}.png",
+        json_data: dict[str, Any] = await BalanceCache.get_or_fetch(
+            chain=chain, 
+            address=address, 
+            fetch=lambda: self.fetch_balances(chain=chain, address=address, session=session),
         )
-        json_data: dict[str, Any] = dict(address=address, value=0, tokens=[], chain=chain_data)
+        return (chain, address, json_data)
+
+    @single_flight(key=lambda self, chain, address, session: f'balance:{chain}:{address}')
+    async def fetch_balances(self, chain: str, address: str, session: aiohttp.ClientSession) -> tuple[dict, str | None]:
+        json_data: dict[str, Any] = ChainBalance.empty(address=address, chain=chain).to_dict()
         if chain == 'merlin':
             res: dict[str, Any] | None = await self.get_balances_from_merlin(chain=chain, address=address, session=session)
+            source: str = 'merlin'
         else:
             res: dict[str, Any] | None = await self.get_balances_from_cqt(chain=chain, address=address, session=session)
-        if res:
-            json_data = res
-        return (chain, address, json_data)
+            source: str = 'cqt'
+        if not res:
+            return json_data, None
+        return res, source
     
-    @retry(retries=3)
+    @retry(retries=3, host=os.getenv(key='CQT_DOMAIN'))
     async def request_balances_from_cqt(self, chain: str, address: str, session: aiohttp.ClientSession) -> dict | None:
         url: str = f"{os.getenv(key='CQT_DOMAIN')}/{chain}/address/{address}/balances_v2/"
         headers: dict[str, str] = {
@@ -214,6 +160,7 @@ class WalletHandler():
             "X-Requested-With": "com.covalenthq.sdk.python/0.9.8"
         }
 
+        await RateLimiter.acquire(name='cqt')
         async with session.get(url=url, headers=headers, timeout=5) as response:
             # logger.warning(msg=f"{response.status} {chain} {address}")
             if response.status == 200:
@@ -225,44 +172,22 @@ class WalletHandler():
         network_name: str | None = constants.CHAIN_DICT.get(chain, dict()).get('cqt')
         if not network_name:
             return
-        res: dict[str, Any] | None = await self.request_balances_from_cqt(network_name, address, session)
+        try:
+            res: dict[str, Any] | None = await self.request_balances_from_cqt(network_name, address, session)
+        except Exception as e:
+            logger.warning(msg=f'CQT balances error {network_name} {address}: {e}')
+            return
         if not res:
             return
-        chain_id: str = res['data']['chain_id']
-        chain_name: str = res['data']['chain_name']
-        items: dict[str, Any] = res['data']['items']
-        tokens: list = []
-        value: int = 0
-        chain_data = dict(
-            id = str(object=chain_id),
-            name = constants.CQT_CHAIN_DICT[chain_name],
-            logo = f"{os.getenv(key='S3_DOMAIN')}/chains/logo/{constants.CQT_CHAIN_DICT[chain_name]}.png",
-        )
-        for item in items:
-            price_usd: float | None = item.get('quote_rate')
-            price_usd_24h: float | None = item.get('quote_rate_24h')
-            price_change: float | None = round(number=(price_usd-price_usd_24h)/price_usd_24h*100, ndigits=4) if price_usd and price_usd_24h else None
-            tokens.append(dict(
-                symbol = item['contract_ticker_symbol'],
-                name = item['contract_name'],
-                decimals = item['contract_decimals'],
-                amount = item['balance'],
-                address = re.sub(pattern=r"0xe{40}|1{32}|0x0{36}800a", repl=constants.ZERO_ADDRESS, string=item['contract_address']),
-                price_usd = price_usd,
-                value_usd = item['quote'],
-                price_change_24h = price_change,
-                logo = item['logo_url'],
-            ))
-            value += item.get('quote') or 0
-        json_data: dict[str, Any] = dict(address=address, value=value, tokens=tokens, chain=chain_data)
-        return json_data
+        return ChainBalance.from_cqt(address=address, data=res['data']).to_dict()
     
-    @retry(retries=3)
+    @retry(retries=3, host=os.getenv(key='MERLIN_DOMAIN'))
     async def request_balances_from_merlin(self, address: str, session: aiohttp.ClientSession) -> dict | None:
         url: str | None = os.getenv(key='MERLIN_DOMAIN')
         headers: dict[str, str] = {'Content-Type': 'application/json'}
 
         timeout = ClientTimeout(connect=3, sock_read=6)
+        await RateLimiter.acquire(name='merlin')
         async with session.get(url=f"{url}/address.getAddressTokenBalance?input=%7B%22json%22%3A%7B%22address%22%3A%22{address}%22%2C%22tokenType%22%3A%22erc20%22%7D%7D", headers=headers, timeout=timeout) as response:
             if response.status == 200:
                 return await response.json()
@@ -270,35 +195,16 @@ class WalletHandler():
                 response.raise_for_status()
 
     async def get_balances_from_merlin(self, chain: str, address: str, session: aiohttp.ClientSession) -> dict | None:
-        res: dict[str, Any] | None = await self.request_balances_from_merlin(address, session)
+        try:
+            res: dict[str, Any] | None = await self.request_balances_from_merlin(address, session)
+        except Exception as e:
+            logger.warning(msg=f'Merlin balances error {address}: {e}')
+            return
         if not res:
             return
         
         items: list = res.get('result', {}).get('data', {}).get('json', [])
-        tokens: list = []
-        value: int | None = None
-        chain: dict[str, Any] = dict(
-            id = str(object=constants.CHAIN_DICT[chain]['id']),
-            name = chain,
-            logo = f"{os.getenv(key='S3_DOMAIN')}/chains/logo/{chain}.png",
-        )
-        for item in items:
-            try:
-                tokens.append(dict(
-                    symbol = item['symbol'],
-                    name = item['name'],
-                    decimals = item['decimals'],
-                    amount = int(float(item.get('balance', 0)))/(10 ** int(item['decimals'])),
-                    address = item['token_address'],
-                    price_usd = None,
-                    value_usd = None,
-                    price_change_24h = None,
-                    logo = None,
-                ))
-            except Exception as e:
-                print(e)
-        json_data: dict[str, Any] = dict(address=address, value=value, tokens=tokens, chain=chain)
-        return json_data
+        return ChainBalance.from_merlin(address=address, chain=chain, items=items).to_dict()
     
     def token_transaction(self, chain: str, private_key: str, input_token: str, output_token: str, amount: str, slippageBps: int) -> str | None:
         hash_tx: str | None = None
@@ -0,0 +1,131 @@
+"""Micro-benchmark for balance normalisation and the WalletAPIView merge.
+
+Compares the previous dict-building code (kept inline below) with
+w3.balances on a synthetic CQT payload. No Django or network needed:
+
+    python scripts/bench_balances.py [--tokens 500] [--wallets 20] [--chains 8]
+"""
+from typing import Any
+import argparse
+import copy
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from utils import constants
+from w3.balances import ChainBalance
+
+
+def cqt_payload(tokens: int) -> dict[str, Any]:
+    items: list[dict[str, Any]] = []
+    for i in range(tokens):
+        items.append(dict(
+            contract_ticker_symbol=f'TK{i}',
+            contract_name=f'Token {i}',
+            contract_decimals=18,
+            balance=str(object=10 ** 18 * (i + 1)),
+            contract_address='0x' + 'e' * 40 if i == 0 else f'0x{i:040x}',
+            quote_rate=1.0 + i / 100 if i % 3 else None,
+            quote_rate_24h=1.1 + i / 100 if i % 3 else None,
+            quote=float(i) if i % 3 else None,
+            logo_url=f'https://logos.example/{i}.png',
+        ))
+    return dict(chain_id='1', chain_name='eth-mainnet', items=items)
+
+
+def legacy_from_cqt(address: str, data: dict[str, Any]) -> dict[str, Any]:
+    """get_balances_from_cqt before the change."""
+    tokens: list = []
+    value: int = 0
+    chain_data = dict(
+        id = str(object=data['chain_id']),
+        name = constants.CQT_CHAIN_DICT[data['chain_name']],
+        logo = f"{os.getenv(key='S3_DOMAIN')}/chains/logo/{constants.CQT_CHAIN_DICT[data['chain_name']]}.png",
+    )
+    for item in data['items']:
+        price_usd: float | None = item.get('quote_rate')
+        price_usd_24h: float | None = item.get('quote_rate_24h')
+        price_change: float | None = round(number=(price_usd-price_usd_24h)/price_usd_24h*100, ndigits=4) if price_usd and price_usd_24h else None
+        tokens.append(dict(
+            symbol = item['contract_ticker_symbol'],
+            name = item['contract_name'],
+            decimals = item['contract_decimals'],
+            amount = item['balance'],
+            address = re.sub(pattern=r"0xe{40}|1{32}|0x0{36}800a", repl=constants.ZERO_ADDRESS, string=item['contract_address']),
+            price_usd = price_usd,
+            value_usd = item['quote'],
+            price_change_24h = price_change,
+            logo = item['logo_url'],
+        ))
+        value += item.get('quote') or 0
+    return dict(address=address, value=value, tokens=tokens, chain=chain_data)
+
+
+def serializer_rows(wallets: int) -> list[dict[str, Any]]:
+    return [dict(id=i, name=f'wallet {i}', address=f'0x{i:040x}', type='EVM', created_at='2024-01-01T00:00:00Z') for i in range(wallets)]
+
+
+def balances(rows: list[dict[str, Any]], chains: int) -> dict[str, dict[str, dict]]:
+    data: dict[str, Any] = cqt_payload(tokens=5)
+    names: list[str] = list(constants.CHAIN_DICT)[:chains]
+    return {c: {s['address']: ChainBalance.from_cqt(address=s['address'], data=data).to_dict() for s in rows} for c in names}
+
+
+def legacy_merge(rows: list[dict[str, Any]], balance_for_account: dict[str, dict[str, dict]]) -> dict:
+    data = dict()
+    for k, v in balance_for_account.items():
+        res: list = []
+        s_data = copy.deepcopy(x=rows)
+        for s in s_data:
+            d: dict = v.get(s['address'])
+            if not d:
+                continue
+            s['value'] = d.get('value', 0)
+            s['tokens'] = d.get('tokens', [])
+            s['chain'] = d.get('chain')
+            s['meta'] = d.get('meta')
+            res.append(s)
+        data[k] = res
+    return data
+
+
+def merge(rows: list[dict[str, Any]], balance_for_account: dict[str, dict[str, dict]]) -> dict:
+    data = dict()
+    for k, v in balance_for_account.items():
+        data[k] = [
+            dict(s, value=d.get('value', 0), tokens=d.get('tokens', []), chain=d.get('chain'), meta=d.get('meta'))
+            for s in rows if (d := v.get(s['address']))
+        ]
+    return data
+
+
+def best(func, number: int) -> float:
+    return min(timeit.repeat(stmt=func, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument('--tokens', type=int, default=500)
+    parser.add_argument('--wallets', type=int, default=20)
+    parser.add_argument('--chains', type=int, default=8)
+    args: argparse.Namespace = parser.parse_args()
+
+    address: str = '0x' + '1' * 40
+    payload: dict[str, Any] = cqt_payload(tokens=args.tokens)
+    assert legacy_from_cqt(address=address, data=payload)['tokens'][0]['address'] == ChainBalance.from_cqt(address=address, data=payload).to_dict()['tokens'][0]['address']
+    before: float = best(lambda: legacy_from_cqt(address=address, data=payload), number=50) / args.tokens
+    after: float = best(lambda: ChainBalance.from_cqt(address=address, data=payload).to_dict(), number=50) / args.tokens
+    print(f'normalise per token: {before * 1e6:.2f}us -> {after * 1e6:.2f}us')
+
+    rows: list[dict[str, Any]] = serializer_rows(wallets=args.wallets)
+    balance_for_account: dict[str, dict[str, dict]] = balances(rows=rows, chains=args.chains)
+    before = best(lambda: legacy_merge(rows=rows, balance_for_account=balance_for_account), number=200)
+    after = best(lambda: merge(rows=rows, balance_for_account=balance_for_account), number=200)
+    print(f'response merge:      {before * 1e6:.0f}us -> {after * 1e6:.0f}us')
+
+
+if __name__ == '__main__':
+    main()